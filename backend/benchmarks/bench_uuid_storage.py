@@ -0,0 +1,145 @@
+"""Compare user id storage on SQLite: 36-character strings versus 16-byte blobs.
+
+Run from the backend directory:
+
+    uv run python benchmarks/bench_uuid_storage.py --users 1000000
+
+Builds one throwaway database per layout with the columns of the ``user``
+table, then reports the file size, the size of the primary-key index and the
+latency of primary-key lookups, through SQLAlchemy (the query the JWT auth
+path runs on every request) and directly with ``sqlite3`` to leave out the
+driver and ORM overhead.
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import sqlalchemy as sa
+from fastapi_users.db import SQLAlchemyBaseUserTableUUID
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import DeclarativeBase, mapped_column
+
+from backend.column_types import CompactUUID
+
+# label -> CompactUUID ids
+LAYOUTS = {
+    "CHAR(36) (GUID)": False,
+    "BLOB(16) (CompactUUID)": True,
+}
+
+
+def user_table(compact: bool) -> sa.Table:
+    """The ``user`` table of ``backend.services.users.models`` with the given id layout."""
+
+    class Base(DeclarativeBase):
+        pass
+
+    class User(SQLAlchemyBaseUserTableUUID, Base):
+        __tablename__ = "user"
+        if compact:
+            id = mapped_column(CompactUUID, primary_key=True, default=uuid.uuid4)
+
+        created_at = mapped_column(sa.DateTime, default=datetime.utcnow)
+
+    return User.__table__
+
+
+def make_users(ids: list[uuid.UUID], offset: int) -> list[dict]:
+    now = datetime.utcnow()
+    # Length of an argon2id hash with the default parameters
+    hashed_password = "$argon2id$v=19$m=65536,t=3,p=4$" + "x" * 66
+    return [
+        {
+            "id": user_id,
+            "email": f"user{offset + i}@example.com",
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": True,
+            "created_at": now,
+        }
+        for i, user_id in enumerate(ids)
+    ]
+
+
+async def run_layout(path: Path, label: str, compact: bool, ids: list[uuid.UUID], lookups: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    table = user_table(compact)
+    async with engine.begin() as conn:
+        await conn.run_sync(table.metadata.create_all)
+
+    start = time.perf_counter()
+    for offset in range(0, len(ids), 50_000):
+        async with engine.begin() as conn:
+            await conn.execute(sa.insert(table), make_users(ids[offset:offset + 50_000], offset))
+    insert_seconds = time.perf_counter() - start
+
+    sample = random.sample(ids, lookups)
+    async with engine.connect() as conn:
+        page_size = (await conn.exec_driver_sql("PRAGMA page_size")).scalar_one()
+        page_count = (await conn.exec_driver_sql("PRAGMA page_count")).scalar_one()
+
+        statement = sa.select(table).where(table.c.id == sa.bindparam("id"))
+        for user_id in sample[:100]:
+            await conn.execute(statement, {"id": user_id})
+        orm_timings = []
+        for user_id in sample:
+            lookup_start = time.perf_counter()
+            row = (await conn.execute(statement, {"id": user_id})).one()
+            orm_timings.append((time.perf_counter() - lookup_start) * 1_000_000)
+            assert row.id == user_id
+    await engine.dispose()
+
+    connection = sqlite3.connect(path)
+    # The primary key is the table's only automatic index
+    key_index_bytes = connection.execute(
+        "SELECT sum(pgsize) FROM dbstat WHERE name LIKE 'sqlite_autoindex_user_%'"
+    ).fetchone()[0]
+    keys = [user_id.bytes if compact else str(user_id) for user_id in sample]
+    raw_timings = []
+    for key in keys:
+        lookup_start = time.perf_counter()
+        assert connection.execute('SELECT * FROM "user" WHERE id = ?', (key,)).fetchone() is not None
+        raw_timings.append((time.perf_counter() - lookup_start) * 1_000_000)
+    connection.close()
+
+    print(
+        f"{label:<24} {page_size * page_count / 2**20:9.1f} MiB {key_index_bytes / 2**20:9.1f} MiB"
+        f" {insert_seconds:7.1f} s {percentile(orm_timings, 0.5):9.1f} µs {percentile(orm_timings, 0.99):9.1f} µs"
+        f" {percentile(raw_timings, 0.5):9.1f} µs {percentile(raw_timings, 0.99):9.1f} µs"
+    )
+
+
+def percentile(timings: list[float], fraction: float) -> float:
+    return sorted(timings)[int((len(timings) - 1) * fraction)]
+
+
+async def run(users: int, lookups: int, directory: Path) -> None:
+    ids = [uuid.uuid4() for _ in range(users)]
+    print(f"{users:,} users, {lookups:,} random lookups by id\n")
+    print(
+        f"{'layout':<24} {'db size':>13} {'key index':>13} {'insert':>9}"
+        f" {'orm p50':>12} {'orm p99':>12} {'sqlite3 p50':>12} {'sqlite3 p99':>12}"
+    )
+    for i, (label, compact) in enumerate(LAYOUTS.items()):
+        await run_layout(directory / f"users-{i}.db", label, compact, ids, lookups)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run(args.users, args.lookups, Path(tmp)))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,11 @@ from sqlalchemy import pool
 from alembic import context
 from backend.settings import settings
 from backend.db import Base
+from backend import online_migrations
 
 from backend.services.users.models import User
+from backend.services.idempotency.models import IdempotencyRecord
+from backend.services.announcements.models import Announcement
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -31,6 +34,13 @@ target_metadata = Base.metadata
 
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL_SYNC)
 
+# Options passed on the command line, e.g.
+#   alembic -x lock_timeout_ms=2000 -x report=migration-report.json upgrade head
+x_args = context.get_x_argument(as_dictionary=True)
+lock_timeout_ms = int(x_args.get("lock_timeout_ms", settings.MIGRATION_LOCK_TIMEOUT_MS))
+statement_timeout_ms = int(x_args.get("statement_timeout_ms", settings.MIGRATION_STATEMENT_TIMEOUT_MS))
+report_path = x_args.get("report", settings.MIGRATION_REPORT_PATH)
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -70,13 +80,29 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        online_migrations.apply_timeouts(connection, lock_timeout_ms, statement_timeout_ms)
+
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER most things in place, use batch "move and copy"
+            render_as_batch=connection.dialect.name == "sqlite",
+            # Keep each revision in its own short transaction so locks are released
+            # early and online_migrations can step outside of it for CONCURRENTLY
+            transaction_per_migration=True,
+            on_version_apply=online_migrations.report.on_version_apply,
+            # Restored by online_migrations after lifting it for CONCURRENTLY statements
+            lock_timeout_ms=lock_timeout_ms,
         )
 
         with context.begin_transaction():
             context.run_migrations()
 
+    if online_migrations.report.revisions:
+        print(online_migrations.report.summary())
+        if report_path:
+            online_migrations.report.write_json(report_path)
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,60 @@
+"""Store user ids as compact uuids
+
+Revision ID: c51d0e6f8a27
+Revises: 3cff2ad8bf3a
+Create Date: 2026-10-19 21:04:37.218406
+
+Only changes SQLite databases: PostgreSQL already stores GUID as a native
+uuid, which is what CompactUUID uses there too. The table is rebuilt
+online, see ``online_migrations.rebuild_table``.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import fastapi_users_db_sqlalchemy
+
+from backend import online_migrations as online
+from backend.column_types import CompactUUID, stored_as_compact_uuid
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d0e6f8a27'
+down_revision: Union[str, None] = '3cff2ad8bf3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def user_table(id_type) -> sa.Table:
+    return sa.Table('user', sa.MetaData(),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('id', id_type, nullable=False, primary_key=True),
+    sa.Column('email', sa.String(length=320), nullable=False),
+    sa.Column('hashed_password', sa.String(length=1024), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_superuser', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Index('ix_user_email', 'email', unique=True),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if online.is_postgresql() or stored_as_compact_uuid(op.get_bind(), 'user', 'id'):
+        return
+    online.rebuild_table(
+        user_table(fastapi_users_db_sqlalchemy.generics.GUID()),
+        user_table(CompactUUID()),
+        batch_size=5000,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if online.is_postgresql() or not stored_as_compact_uuid(op.get_bind(), 'user', 'id'):
+        return
+    online.rebuild_table(
+        user_table(CompactUUID()),
+        user_table(fastapi_users_db_sqlalchemy.generics.GUID()),
+        batch_size=5000,
+    )
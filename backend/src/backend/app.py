@@ -4,7 +4,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.db import create_db_and_tables
+from backend.frontend import FrontendStaticFiles
+from backend.services.admission.middleware import AdmissionControlMiddleware
+from backend.services.admission.service import AdmissionController, RoutePriorities
+from backend.services.announcements.routes import router as announcements_router
+from backend.services.announcements.service import announcement_sender
 from backend.services.auth.routes import router as auth_router
+from backend.services.health.routes import router as health_router
+from backend.services.health.service import warm_up
+from backend.services.idempotency.middleware import IdempotencyMiddleware
+from backend.services.monitoring.loop_monitor import loop_monitor
+from backend.services.monitoring.middleware import QueryContextMiddleware, TracingMiddleware
+from backend.services.monitoring.routes import router as monitoring_router
+from backend.services.monitoring.tracing import tracer
 from backend.services.users.routes import router as users_router
 from backend.settings import settings
 
@@ -13,10 +25,43 @@ async def lifespan(app: FastAPI):
 
     await create_db_and_tables()
 
+    # Readiness flips only once the first requests will no longer pay for cold caches
+    if settings.WARMUP_ENABLED:
+        await warm_up.run(app)
+    else:
+        warm_up.skip()
+
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+
+    # Pick up announcements whose sender died mid-way
+    if settings.ANNOUNCEMENT_RESUME_ON_STARTUP:
+        await announcement_sender.resume_pending()
+
     yield
 
+    await announcement_sender.stop()
+    await loop_monitor.stop()
+    tracer.shutdown()
+
 app = FastAPI(lifespan=lifespan)
 
+# Replay stored responses for retried POSTs carrying an Idempotency-Key header
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(IdempotencyMiddleware, excluded_paths=settings.IDEMPOTENCY_EXCLUDED_PATHS)
+
+# Attribute database statements to the route that issued them
+if settings.SLOW_QUERY_LOG_ENABLED:
+    app.add_middleware(QueryContextMiddleware)
+
+# Shed low-priority traffic first when requests start queueing
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=AdmissionController(),
+        priorities=RoutePriorities(settings.ADMISSION_ROUTE_PRIORITIES, settings.ADMISSION_DEFAULT_PRIORITY),
+    )
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,9 +71,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so request spans include time spent queued by admission control
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+app.include_router(health_router, prefix="/api", tags=["health"])
 app.include_router(auth_router, prefix="/api", tags=["auth"])
 app.include_router(users_router, prefix="/api", tags=["users"])
+app.include_router(monitoring_router, prefix="/api", tags=["monitoring"])
+app.include_router(announcements_router, prefix="/api", tags=["announcements"])
 
-@app.get("/")
-async def root():
-    return {"message": "Hello World"}
\ No newline at end of file
+if settings.SERVE_FRONTEND:
+    # Mounted last so API routes take precedence over the SPA fallback
+    app.mount("/", FrontendStaticFiles(settings.FRONTEND_DIST_DIR), name="frontend")
+else:
+    @app.get("/")
+    async def root():
+        return {"message": "Hello World"}
\ No newline at end of file
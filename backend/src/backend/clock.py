@@ -0,0 +1,10 @@
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    """Current UTC time without tzinfo, the form the ``DateTime`` columns store and compare against.
+
+    Replaces the deprecated ``datetime.utcnow()``; the columns are not
+    timezone-aware, so aware values cannot be bound on PostgreSQL.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,53 @@
+import uuid
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator
+
+
+class CompactUUID(TypeDecorator):
+    """UUID stored as 16 raw bytes, or as the native ``uuid`` type on PostgreSQL.
+
+    fastapi-users' ``GUID`` falls back to a 36 character string on SQLite, more
+    than twice the size in the table and in every index holding the key, and
+    compared as text. Raw bytes keep the same ordering as the hex form.
+    """
+
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    @property
+    def python_type(self) -> type:
+        return uuid.UUID
+
+    def load_dialect_impl(self, dialect: Dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Any:
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = uuid.UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value: Any, dialect: Dialect) -> Optional[uuid.UUID]:
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(bytes=bytes(value))
+
+
+def stored_as_compact_uuid(connection: sa.Connection, table_name: str, column_name: str) -> Optional[bool]:
+    """Whether the existing column stores uuids the way ``CompactUUID`` does, ``None`` if the table is missing.
+
+    PostgreSQL columns made by ``GUID`` are native uuids already and qualify.
+    """
+    inspector = sa.inspect(connection)
+    if not inspector.has_table(table_name):
+        return None
+    column = next(column for column in inspector.get_columns(table_name) if column["name"] == column_name)
+    return isinstance(column["type"], (sa.LargeBinary, sa.Uuid))
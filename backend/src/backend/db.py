@@ -3,7 +3,10 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from backend.column_types import stored_as_compact_uuid
 from backend.settings import settings
+from backend.services.monitoring.query_log import slow_query_log
+from backend.services.monitoring.tracing import tracer
 
 Base = declarative_base()
 
@@ -26,12 +29,33 @@ def create_database_engine():
         raise ValueError(f"Unsupported database type: {settings.DATABASE_TYPE}")
 
 engine = create_database_engine()
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
+if settings.TRACING_ENABLED:
+    tracer.install(engine)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 async def create_db_and_tables():
+    # Checked first and on its own: SQLite commits DDL right away, a refused
+    # startup must not leave tables behind that the migrations then trip over
+    async with engine.connect() as conn:
+        await conn.run_sync(check_user_id_storage)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+def check_user_id_storage(connection):
+    """Refuse to run against a ``user`` table whose ids are still 36-character strings.
+
+    ``create_all`` does not alter existing tables, and reading string ids
+    through ``CompactUUID`` fails on every user load.
+    """
+    if stored_as_compact_uuid(connection, "user", "id") is False:
+        raise RuntimeError(
+            "user.id is stored as a string but the model expects 16-byte uuids, "
+            "run `backend upgrade-db` to convert the table. It also works for databases "
+            "created without Alembic, stamping them at the revision matching their tables first"
+        )
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
\ No newline at end of file
@@ -0,0 +1,66 @@
+import logging
+import pathlib
+from typing import Optional
+
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_PATH = pathlib.Path(__file__).absolute().parents[2] / "migrations"
+
+# Newest first: the revision that created each table. The app's startup
+# creates missing tables itself, so the newest table present tells how far
+# along the migration history the schema is, whatever alembic_version says.
+REVISION_TABLES = (
+    ("3cff2ad8bf3a", "announcement"),
+    ("7c1f4e2a9b3d", "idempotency_key"),
+    ("333614ead8ed", "user"),
+)
+
+
+def revision_to_stamp(connection: sa.Connection) -> Optional[str]:
+    """Revision the schema has already reached when ``alembic_version`` lags behind it.
+
+    ``None`` when the recorded version is current for the tables present, or
+    when there are no tables yet.
+    """
+    tables = set(sa.inspect(connection).get_table_names())
+    reached = next((index for index, (_, table) in enumerate(REVISION_TABLES) if table in tables), None)
+    if reached is None:
+        return None
+    recorded = None
+    if "alembic_version" in tables:
+        recorded = connection.exec_driver_sql("SELECT version_num FROM alembic_version").scalar()
+    recorded_index = next(
+        (index for index, (revision, _) in enumerate(REVISION_TABLES) if revision == recorded),
+        # Unversioned, or a revision newer than any table-creating one
+        len(REVISION_TABLES) if recorded is None else -1,
+    )
+    return REVISION_TABLES[reached][0] if reached < recorded_index else None
+
+
+def upgrade_database() -> None:
+    """Bring the configured database to the latest revision, whether or not it was made by Alembic.
+
+    Databases whose tables were created by the app's own ``create_all`` are
+    stamped with the revision those tables correspond to first, so ``upgrade``
+    does not try to create tables that already exist.
+    """
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+
+    engine = sa.create_engine(settings.DATABASE_URL_SYNC)
+    try:
+        with engine.connect() as connection:
+            revision = revision_to_stamp(connection)
+    finally:
+        engine.dispose()
+
+    if revision is not None:
+        logger.info("Tables of revision %s already exist, stamping the database there", revision)
+        command.stamp(config, revision)
+    command.upgrade(config, "head")
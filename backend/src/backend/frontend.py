@@ -0,0 +1,142 @@
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+# Vite writes content-hashed bundles as assets/<name>-<hash>.<ext>
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Precompressed siblings (app.js.br, app.js.gz) in order of preference
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass(frozen=True)
+class FileVariant:
+    path: Path
+    stat: os.stat_result
+    etag: str
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    media_type: str
+    cache_control: str
+    identity: FileVariant
+    encoded: dict[str, FileVariant] = field(default_factory=dict)
+
+
+class FrontendStaticFiles:
+    """Serve the built frontend (Vite ``dist/``) from the backend.
+
+    The directory is scanned once at startup, so requests are answered from an
+    in-memory index without touching the filesystem for ``stat`` calls. Unknown
+    paths without a file extension fall back to ``index.html`` so client-side
+    routes work on reload.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], index: str = "index.html"):
+        self.directory = Path(directory)
+        if not self.directory.is_dir():
+            raise RuntimeError(f"Frontend directory '{self.directory}' does not exist, run `npm run build` first")
+        self.files = self._build_index()
+        self.index = self.files.get(f"/{index}")
+
+    def _build_index(self) -> dict[str, StaticAsset]:
+        files: dict[str, StaticAsset] = {}
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = Path(root) / filename
+                if path.suffix in ENCODINGS.values() and path.with_suffix("").exists():
+                    continue
+
+                relative = path.relative_to(self.directory).as_posix()
+                encoded = {}
+                for encoding, suffix in ENCODINGS.items():
+                    compressed = path.with_name(path.name + suffix)
+                    if compressed.is_file():
+                        encoded[encoding] = _variant(compressed, encoding)
+
+                files[f"/{relative}"] = StaticAsset(
+                    media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                    cache_control=IMMUTABLE_CACHE_CONTROL if HASHED_ASSET.match(relative) else REVALIDATE_CACHE_CONTROL,
+                    identity=_variant(path),
+                    encoded=encoded,
+                )
+        return files
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+
+        if scope["method"] not in ("GET", "HEAD"):
+            response: Response = JSONResponse({"detail": "Method Not Allowed"}, status_code=405)
+            await response(scope, receive, send)
+            return
+
+        path = scope["path"]
+        asset = self.files.get(path) or self.files.get(path.rstrip("/") + "/index.html")
+        if asset is None and self._is_client_route(path):
+            asset = self.index
+        if asset is None:
+            response = JSONResponse({"detail": "Not Found"}, status_code=404)
+            await response(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding, variant = _negotiate(asset, request_headers.get("accept-encoding", ""))
+        headers = {"cache-control": asset.cache_control, "etag": variant.etag}
+        if asset.encoded:
+            headers["vary"] = "Accept-Encoding"
+
+        if variant.etag in _parse_etags(request_headers.get("if-none-match", "")):
+            response = Response(status_code=304, headers=headers)
+        else:
+            if encoding:
+                headers["content-encoding"] = encoding
+            response = FileResponse(
+                variant.path,
+                headers=headers,
+                media_type=asset.media_type,
+                stat_result=variant.stat,
+            )
+        await response(scope, receive, send)
+
+    @staticmethod
+    def _is_client_route(path: str) -> bool:
+        # API and asset misses must stay 404s instead of returning HTML
+        if path == "/api" or path.startswith("/api/"):
+            return False
+        return "." not in path.rsplit("/", 1)[-1]
+
+
+def _variant(path: Path, encoding: str = "") -> FileVariant:
+    stat = path.stat()
+    etag_base = f"{stat.st_mtime}-{stat.st_size}-{encoding}"
+    etag = f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+    return FileVariant(path=path, stat=stat, etag=etag)
+
+
+def _negotiate(asset: StaticAsset, accept_encoding: str) -> tuple[str, FileVariant]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+
+    for encoding in ENCODINGS:
+        if encoding in asset.encoded and (encoding in accepted or "*" in accepted):
+            return encoding, asset.encoded[encoding]
+    return "", asset.identity
+
+
+def _parse_etags(if_none_match: str) -> set[str]:
+    return {tag.strip().removeprefix("W/") for tag in if_none_match.split(",") if tag.strip()}
+
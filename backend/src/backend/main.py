@@ -1,24 +1,86 @@
-import json
-from pathlib import Path
+import argparse
+import asyncio
+import logging
+import sys
 import uvicorn
 from backend.settings import settings
 from backend.app import app
 from backend.utils import dump_openapi_schema_and_summary
 
-def main() -> None:
+def serve() -> None:
     print("Hello from backend!!")
-    
+
     # Dump OpenAPI schema and generate summary before starting the server
     dump_openapi_schema_and_summary(app)
 
     reload = settings.ENVIRONMENT == "dev"
 
     uvicorn.run(
-        "backend.main:app", 
-        host=settings.BACKEND_HOST, 
-        port=settings.BACKEND_PORT, 
+        "backend.main:app",
+        host=settings.BACKEND_HOST,
+        port=settings.BACKEND_PORT,
         reload=reload
     )
 
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="backend")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("serve", help="Run the API server (the default)")
+
+    send = commands.add_parser("send-announcement", help="Email an announcement to all verified users")
+    send.add_argument("--subject", required=True)
+    send.add_argument(
+        "--body-file",
+        type=argparse.FileType("r"),
+        default=sys.stdin,
+        help="Plain text body, blank lines separate paragraphs (default: stdin)",
+    )
+
+    resume = commands.add_parser("resume-announcement", help="Continue an interrupted announcement")
+    resume.add_argument("announcement_id", type=int)
+
+    commands.add_parser(
+        "upgrade-db",
+        help="Migrate the database to the latest schema, including databases created without Alembic",
+    )
+
+    calibrate = commands.add_parser(
+        "calibrate-hashing",
+        help="Benchmark password hash parameters on this machine and recommend settings",
+    )
+    calibrate.add_argument("--algorithm", choices=["argon2", "bcrypt"], default=settings.PASSWORD_HASH_ALGORITHM)
+    calibrate.add_argument("--target-ms", type=float, default=250, help="Latency budget per hash (default: 250)")
+    calibrate.add_argument("--max-memory-mib", type=int, default=64, help="Argon2 memory per hash (default: 64)")
+    calibrate.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM, help="Argon2 lanes")
+    calibrate.add_argument("--samples", type=int, default=5, help="Hashes timed per candidate (default: 5)")
+
+    args = parser.parse_args()
+
+    if args.command in (None, "serve"):
+        serve()
+        return
+
+    if args.command == "calibrate-hashing":
+        from backend.services.auth.hashing import calibrate
+
+        calibrate(args.algorithm, args.target_ms, args.max_memory_mib, args.parallelism, args.samples)
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "upgrade-db":
+        from backend.db_upgrade import upgrade_database
+
+        upgrade_database()
+        return
+
+    # Imported here so serving does not pay for the CLI's imports
+    from backend.services.announcements import cli
+
+    if args.command == "send-announcement":
+        asyncio.run(cli.send_announcement(args.subject, args.body_file.read()))
+    elif args.command == "resume-announcement":
+        asyncio.run(cli.resume_announcement(args.announcement_id))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
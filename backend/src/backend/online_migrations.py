@@ -0,0 +1,438 @@
+"""Helpers for running Alembic migrations against a live database.
+
+Migration scripts use these instead of the plain ``op`` calls when a change
+touches a large table:
+
+    from backend import online_migrations as online
+
+    def upgrade() -> None:
+        op.add_column("user", sa.Column("nickname", sa.String(64), nullable=True))
+        online.backfill("user", "nickname = ''", "nickname IS NULL", batch_size=5000)
+        online.create_index("ix_user_nickname", "user", ["nickname"])
+
+``rebuild_table`` changes the storage of a column on SQLite, which can only
+do that by copying the table, while the application keeps writing to it.
+
+Every helper records a timed step in ``report``; ``migrations/env.py`` prints
+it after the run and writes it as JSON when ``-x report=path.json`` is given,
+so a migration can be rehearsed against a production-size copy first.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger("alembic.online_migrations")
+
+
+@dataclass
+class MigrationStep:
+    name: str
+    seconds: float = 0.0
+    rows: Optional[int] = None
+
+
+@dataclass
+class RevisionTiming:
+    revision: str
+    description: str
+    seconds: float = 0.0
+    steps: list[MigrationStep] = field(default_factory=list)
+
+
+class MigrationReport:
+    """Per-revision and per-step timings collected during a migration run."""
+
+    def __init__(self):
+        self.revisions: list[RevisionTiming] = []
+        self._pending_steps: list[MigrationStep] = []
+        self._started = time.perf_counter()
+        self._last_mark = self._started
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[MigrationStep]:
+        migration_step = MigrationStep(name=name)
+        start = time.perf_counter()
+        try:
+            yield migration_step
+        finally:
+            migration_step.seconds = time.perf_counter() - start
+            self._pending_steps.append(migration_step)
+            logger.info("%s took %.3fs", name, migration_step.seconds)
+
+    def on_version_apply(self, ctx, step, heads, run_args) -> None:
+        """Alembic ``on_version_apply`` hook, closes the timing of one revision."""
+        now = time.perf_counter()
+        # The script being run is the "up" side of the step in both directions
+        revision = step.up_revision
+        self.revisions.append(
+            RevisionTiming(
+                revision=revision.revision if revision else "",
+                description=(revision.doc or "") if revision else "",
+                seconds=now - self._last_mark,
+                steps=self._pending_steps,
+            )
+        )
+        self._pending_steps = []
+        self._last_mark = now
+
+    @property
+    def total_seconds(self) -> float:
+        return self._last_mark - self._started
+
+    def summary(self) -> str:
+        lines = ["Migration timing report", ""]
+        for timing in self.revisions:
+            lines.append(f"{timing.seconds:10.3f}s  {timing.revision}  {timing.description}")
+            for migration_step in timing.steps:
+                rows = f" ({migration_step.rows} rows)" if migration_step.rows is not None else ""
+                lines.append(f"{migration_step.seconds:10.3f}s    - {migration_step.name}{rows}")
+        lines.append(f"{self.total_seconds:10.3f}s  total")
+        return "\n".join(lines)
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "total_seconds": self.total_seconds,
+                    "revisions": [asdict(timing) for timing in self.revisions],
+                },
+                f,
+                indent=2,
+            )
+
+
+report = MigrationReport()
+
+
+def apply_timeouts(connection: sa.Connection, lock_timeout_ms: int, statement_timeout_ms: int) -> None:
+    """Set session-level lock and statement timeouts (PostgreSQL only).
+
+    A low lock timeout makes DDL that cannot get its lock fail fast instead of
+    queueing every other query on the table behind it. ``0`` disables a timeout.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    connection.exec_driver_sql(f"SET lock_timeout = {int(lock_timeout_ms)}")
+    connection.exec_driver_sql(f"SET statement_timeout = {int(statement_timeout_ms)}")
+    connection.commit()
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+@contextmanager
+def _outside_transaction() -> Iterator[None]:
+    """Commit the migration transaction and run the block in autocommit mode."""
+    with op.get_context().autocommit_block():
+        yield
+
+
+@contextmanager
+def _without_lock_timeout() -> Iterator[None]:
+    """Lift ``lock_timeout`` around ``CONCURRENTLY`` statements, restoring it afterwards.
+
+    A concurrent build waits for every older transaction to finish and that
+    wait counts against ``lock_timeout``, so one long transaction would cancel
+    the build and leave an INVALID index. Meanwhile it only holds a SHARE
+    UPDATE EXCLUSIVE lock, which does not block reads or writes.
+    """
+    op.execute("SET lock_timeout = 0")
+    try:
+        yield
+    finally:
+        # Passed to context.configure() by env.py next to apply_timeouts()
+        lock_timeout_ms = op.get_context().opts.get("lock_timeout_ms")
+        op.execute("RESET lock_timeout" if lock_timeout_ms is None else f"SET lock_timeout = {int(lock_timeout_ms)}")
+
+
+def create_index(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    **kw,
+) -> None:
+    """Create an index without blocking writes (``CREATE INDEX CONCURRENTLY`` on PostgreSQL).
+
+    A concurrent build that fails, on a lock timeout for example, leaves an
+    INVALID index behind that ``IF NOT EXISTS`` would mistake for a finished
+    one, so on PostgreSQL such an index is dropped and built again.
+    """
+    with report.step(f"create index {index_name} on {table_name}"):
+        if is_postgresql():
+            with _outside_transaction():
+                valid = _postgresql_index_is_valid(index_name)
+                if valid:
+                    logger.info("index %s already exists", index_name)
+                    return
+                with _without_lock_timeout():
+                    if valid is False:
+                        logger.warning("index %s is INVALID after an earlier failed build, rebuilding it", index_name)
+                        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+                    op.create_index(
+                        index_name,
+                        table_name,
+                        list(columns),
+                        unique=unique,
+                        postgresql_concurrently=True,
+                        **kw,
+                    )
+        else:
+            op.create_index(index_name, table_name, list(columns), unique=unique, if_not_exists=True, **kw)
+
+
+def _postgresql_index_is_valid(index_name: str) -> Optional[bool]:
+    """``pg_index.indisvalid`` of the index visible under this name, ``None`` if there is none."""
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": index_name},
+    ).scalar_one_or_none()
+
+
+def drop_index(index_name: str, table_name: str) -> None:
+    """Drop an index without blocking reads and writes (``DROP INDEX CONCURRENTLY`` on PostgreSQL)."""
+    with report.step(f"drop index {index_name} on {table_name}"):
+        if is_postgresql():
+            with _outside_transaction(), _without_lock_timeout():
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+        else:
+            op.drop_index(index_name, table_name=table_name, if_exists=True)
+
+
+def backfill(
+    table_name: str,
+    set_clause: str,
+    where_clause: str,
+    key_column: str = "id",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+    params: Optional[dict] = None,
+) -> int:
+    """Update ``table_name`` in committed batches of ``batch_size`` rows.
+
+    ``where_clause`` must stop matching a row once it has been updated (for
+    example ``new_column IS NULL``), otherwise the loop never ends. Each batch
+    commits on its own so row locks are held briefly, and ``pause_seconds``
+    between batches leaves room for regular traffic and replication.
+    """
+    table = sa.table(table_name, sa.column(key_column))
+    preparer = op.get_bind().dialect.identifier_preparer
+    quoted_table = preparer.format_table(table)
+    quoted_key = preparer.quote(key_column)
+    update = sa.text(
+        f"UPDATE {quoted_table} SET {set_clause} WHERE {quoted_key} IN "
+        f"(SELECT {quoted_key} FROM {quoted_table} WHERE {where_clause} LIMIT :batch_size)"
+    )
+    count = sa.text(f"SELECT count(*) FROM {quoted_table} WHERE {where_clause}")
+    bind_params = {**(params or {}), "batch_size": batch_size}
+
+    with report.step(f"backfill {table_name}") as migration_step, _outside_transaction():
+        remaining = op.get_bind().execute(count, params or {}).scalar_one()
+        updated = 0
+        started = time.perf_counter()
+        while True:
+            result = op.get_bind().execute(update, bind_params)
+            if not result.rowcount:
+                break
+            updated += result.rowcount
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "backfill %s: %d/%d rows (%.0f rows/s)",
+                table_name,
+                updated,
+                remaining,
+                updated / elapsed if elapsed else 0,
+            )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+        migration_step.rows = updated
+    return updated
+
+
+def rebuild_table(
+    source: sa.Table,
+    target: sa.Table,
+    key_column: str = "id",
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+) -> int:
+    """Rebuild a SQLite table from the ``source`` layout into ``target`` without a long write lock.
+
+    Both arguments describe the same table (same name and column names) with
+    different column types; values are read through the types of ``source``
+    and written through those of ``target``, which does the conversion. The
+    rows are copied in committed batches into a shadow table while triggers
+    log the keys of rows written in the meantime. Logged rows are then copied
+    again, and a final ``BEGIN IMMEDIATE`` transaction replays the last few,
+    swaps the tables and recreates the indexes of ``target``. Writers are
+    blocked only during that transaction. Unique and check constraints are
+    carried over, foreign keys are not. If any step fails the shadow table
+    and triggers are removed and the original table is left as it was.
+
+    Other databases change column types in place, so migrations call this on
+    SQLite only.
+    """
+    if op.get_bind().dialect.name != "sqlite":
+        raise RuntimeError(
+            f"rebuild_table only supports SQLite, not {op.get_bind().dialect.name}; "
+            "use op.alter_column(..., type_=...) there"
+        )
+
+    table_name = source.name
+    key = source.c[key_column]
+    shadow = sa.Table(
+        f"_{table_name}_new",
+        sa.MetaData(),
+        *(
+            sa.Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+                server_default=column.server_default.arg if column.server_default is not None else None,
+            )
+            for column in target.columns
+        ),
+        *(
+            sa.UniqueConstraint(*constraint.columns.keys(), name=constraint.name)
+            for constraint in target.constraints
+            if isinstance(constraint, sa.UniqueConstraint)
+        ),
+        *(
+            sa.CheckConstraint(constraint.sqltext, name=constraint.name)
+            for constraint in target.constraints
+            if isinstance(constraint, sa.CheckConstraint)
+        ),
+    )
+    changes = sa.Table(
+        f"_{table_name}_changes",
+        sa.MetaData(),
+        sa.Column("seq", sa.Integer, primary_key=True),
+        # Same storage as the source key, the triggers copy it verbatim
+        sa.Column("row_key", key.type),
+    )
+    preparer = op.get_bind().dialect.identifier_preparer
+    quoted_table = preparer.quote(table_name)
+    quoted_changes = preparer.quote(changes.name)
+    quoted_key = preparer.quote(key_column)
+    triggers = {
+        f"{changes.name}_insert": ("INSERT", ["NEW"]),
+        f"{changes.name}_update": ("UPDATE", ["OLD", "NEW"]),
+        f"{changes.name}_delete": ("DELETE", ["OLD"]),
+    }
+
+    def copy_changes(bind: sa.Connection) -> int:
+        """Copy the next batch of rows logged in ``changes`` again, returns how many log entries it applied."""
+        entries = bind.execute(
+            sa.select(changes.c.seq, changes.c.row_key).order_by(changes.c.seq).limit(batch_size)
+        ).all()
+        if not entries:
+            return 0
+        keys = {entry.row_key for entry in entries}
+        rows = bind.execute(sa.select(source).where(key.in_(keys))).mappings().all()
+        bind.execute(sa.delete(shadow).where(shadow.c[key_column].in_(keys)))
+        if rows:
+            bind.execute(sa.insert(shadow), [dict(row) for row in rows])
+        bind.execute(sa.delete(changes).where(changes.c.seq <= entries[-1].seq))
+        return len(entries)
+
+    def copy_and_swap(bind: sa.Connection) -> int:
+        with report.step(f"create shadow table for {table_name}"):
+            shadow.create(bind)
+            changes.create(bind)
+            for trigger_name, (event, refs) in triggers.items():
+                inserts = " ".join(f"INSERT INTO {quoted_changes} (row_key) VALUES ({ref}.{quoted_key});" for ref in refs)
+                bind.exec_driver_sql(
+                    f"CREATE TRIGGER {preparer.quote(trigger_name)} AFTER {event} ON {quoted_table} BEGIN {inserts} END"
+                )
+
+        with report.step(f"copy {table_name}") as migration_step:
+            remaining = bind.execute(sa.select(sa.func.count()).select_from(source)).scalar_one()
+            copied = 0
+            last_key = None
+            started = time.perf_counter()
+            while True:
+                statement = sa.select(source).order_by(key).limit(batch_size)
+                if last_key is not None:
+                    statement = statement.where(key > last_key)
+                rows = bind.execute(statement).mappings().all()
+                if not rows:
+                    break
+                with _sqlite_transaction(bind):
+                    # Rows written since the copy started may already be there through the change log
+                    bind.execute(sa.insert(shadow).prefix_with("OR REPLACE"), [dict(row) for row in rows])
+                copied += len(rows)
+                last_key = rows[-1][key_column]
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    "copy %s: %d/%d rows (%.0f rows/s)",
+                    table_name,
+                    copied,
+                    remaining,
+                    copied / elapsed if elapsed else 0,
+                )
+                if pause_seconds:
+                    time.sleep(pause_seconds)
+            migration_step.rows = copied
+
+        with report.step(f"catch up on writes to {table_name}") as migration_step:
+            migration_step.rows = 0
+            while True:
+                with _sqlite_transaction(bind):
+                    applied = copy_changes(bind)
+                migration_step.rows += applied
+                # Whatever is logged from here on is left to the swap
+                if applied < batch_size:
+                    break
+
+        with report.step(f"swap {table_name} (writes blocked)") as migration_step, _sqlite_transaction(bind, "IMMEDIATE"):
+            migration_step.rows = 0
+            while applied := copy_changes(bind):
+                migration_step.rows += applied
+            for trigger_name in triggers:
+                bind.exec_driver_sql(f"DROP TRIGGER {preparer.quote(trigger_name)}")
+            changes.drop(bind)
+            bind.exec_driver_sql(f"DROP TABLE {quoted_table}")
+            bind.exec_driver_sql(f"ALTER TABLE {preparer.quote(shadow.name)} RENAME TO {quoted_table}")
+            for index in target.indexes:
+                index.create(bind)
+        return copied
+
+    def drop_shadow(bind: sa.Connection) -> None:
+        for trigger_name in triggers:
+            bind.exec_driver_sql(f"DROP TRIGGER IF EXISTS {preparer.quote(trigger_name)}")
+        shadow.drop(bind, checkfirst=True)
+        changes.drop(bind, checkfirst=True)
+
+    with _outside_transaction():
+        bind = op.get_bind()
+        # Leftovers of an interrupted run
+        drop_shadow(bind)
+        try:
+            copied = copy_and_swap(bind)
+        except BaseException:
+            drop_shadow(bind)
+            raise
+    return copied
+
+
+@contextmanager
+def _sqlite_transaction(bind: sa.Connection, mode: str = "") -> Iterator[None]:
+    """Explicit transaction on an autocommit SQLite connection, ``IMMEDIATE`` takes the write lock up front."""
+    bind.exec_driver_sql(f"BEGIN {mode}".strip())
+    try:
+        yield
+    except BaseException:
+        bind.exec_driver_sql("ROLLBACK")
+        raise
+    bind.exec_driver_sql("COMMIT")
@@ -0,0 +1,255 @@
+import base64
+import datetime
+import decimal
+import json
+import uuid
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, Optional, TypeVar
+
+from fastapi import Depends
+from sqlalchemy import ColumnElement, func, inspect, insert, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from backend.db import Base, get_async_session
+
+ModelT = TypeVar("ModelT", bound=Base)
+RepositoryT = TypeVar("RepositoryT", bound="AsyncRepository")
+
+
+class ConcurrentUpdateError(Exception):
+    """Raised when an optimistic-locking update finds a newer version of the row."""
+
+
+@dataclass
+class Page(Generic[ModelT]):
+    items: list[ModelT]
+    next_cursor: Optional[str]
+
+
+def _to_cursor_value(value: Any) -> Any:
+    # datetime is a subclass of date
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if isinstance(value, bytes):
+        return base64.urlsafe_b64encode(value).decode()
+    return value
+
+
+def _from_cursor_value(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type in (datetime.datetime, datetime.date, datetime.time):
+        return python_type.fromisoformat(value)
+    if python_type in (uuid.UUID, decimal.Decimal):
+        return python_type(value)
+    if python_type is bytes:
+        return base64.urlsafe_b64decode(value.encode())
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    if not isinstance(value, python_type):
+        raise TypeError(f"Expected {python_type.__name__}, got {type(value).__name__}")
+    return value
+
+
+def _python_type(column) -> type:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return object
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([_to_cursor_value(value) for value in values]).encode()).decode()
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> list[Any]:
+    """Decode a cursor made by ``encode_cursor`` back into values of ``types``, one per sort column."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(f"Expected {len(types)} cursor values")
+        return [_from_cursor_value(value, python_type) for value, python_type in zip(values, types)]
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+class AsyncRepository(Generic[ModelT]):
+    """Async data access for one model, the base for service classes.
+
+    Subclasses only set ``model``:
+
+        class ExampleService(AsyncRepository[ExampleModel]):
+            model = ExampleModel
+
+    Bulk writes go through a single executemany instead of one flush per row,
+    list endpoints use keyset pagination so deep pages stay as cheap as the
+    first, and ``columns=`` restricts the SELECT to the attributes a caller needs.
+    """
+
+    model: type[ModelT]
+    # Column used for optimistic locking by update_versioned()
+    version_column: str = "version"
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def primary_key(self):
+        return inspect(self.model).primary_key[0]
+
+    def _select(self, columns: Optional[Sequence[str]] = None):
+        statement = select(self.model)
+        if columns:
+            statement = statement.options(load_only(*(getattr(self.model, name) for name in columns)))
+        return statement
+
+    async def get(self, id: Any, columns: Optional[Sequence[str]] = None) -> Optional[ModelT]:
+        if not columns:
+            return await self.session.get(self.model, id)
+        result = await self.session.execute(self._select(columns).where(self.primary_key == id))
+        return result.scalar_one_or_none()
+
+    async def count(self, *where: ColumnElement[bool]) -> int:
+        result = await self.session.execute(select(func.count()).select_from(self.model).where(*where))
+        return result.scalar_one()
+
+    async def create(self, values: dict[str, Any]) -> ModelT:
+        instance = self.model(**values)
+        self.session.add(instance)
+        await self.session.commit()
+        await self.session.refresh(instance)
+        return instance
+
+    async def bulk_insert(self, rows: Iterable[dict[str, Any]], batch_size: int = 1000) -> int:
+        """Insert plain dicts with one executemany per batch, returns the row count."""
+        inserted = 0
+        for batch in _batched(rows, batch_size):
+            await self.session.execute(insert(self.model), batch)
+            inserted += len(batch)
+        await self.session.commit()
+        return inserted
+
+    async def bulk_upsert(
+        self,
+        rows: Iterable[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """Insert rows, updating ``update_columns`` of rows that already exist (``ON CONFLICT``)."""
+        dialect = self.session.bind.dialect.name
+        if dialect == "postgresql":
+            dialect_insert = postgresql.insert
+        elif dialect == "sqlite":
+            dialect_insert = sqlite.insert
+        else:
+            raise NotImplementedError(f"bulk_upsert is not supported on {dialect}")
+
+        upserted = 0
+        for batch in _batched(rows, batch_size):
+            statement = dialect_insert(self.model)
+            columns = update_columns or [name for name in batch[0] if name not in index_elements]
+            if columns:
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(index_elements),
+                    set_={name: statement.excluded[name] for name in columns},
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=list(index_elements))
+            await self.session.execute(statement, batch)
+            upserted += len(batch)
+        await self.session.commit()
+        return upserted
+
+    async def paginate(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        order_by: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        where: Sequence[ColumnElement[bool]] = (),
+    ) -> Page[ModelT]:
+        """Keyset pagination ordered by ``order_by`` with the primary key as tie-breaker."""
+        primary_key = self.primary_key
+        keys = [primary_key] if order_by in (None, primary_key.key) else [getattr(self.model, order_by), primary_key]
+        if columns:
+            columns = list(dict.fromkeys([*columns, *(key.key for key in keys)]))
+
+        statement = self._select(columns).where(*where).order_by(*keys).limit(limit + 1)
+        if cursor is not None:
+            after = decode_cursor(cursor, [_python_type(key) for key in keys])
+            if len(after) == 1:
+                statement = statement.where(keys[0] > after[0])
+            else:
+                statement = statement.where(tuple_(*keys) > tuple_(*after, types=[key.type for key in keys]))
+
+        items = list((await self.session.execute(statement)).scalars())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([getattr(items[-1], key.key) for key in keys])
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def stream(
+        self,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+        where: Sequence[ColumnElement[bool]] = (),
+    ) -> AsyncIterator[ModelT]:
+        """Iterate over matching rows with a server-side cursor, ``batch_size`` rows at a time."""
+        statement = self._select(columns).where(*where).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(statement)
+        try:
+            async for instance in result:
+                yield instance
+        finally:
+            await result.close()
+
+    async def update_versioned(self, id: Any, expected_version: int, values: dict[str, Any]) -> Optional[ModelT]:
+        """Update a row only if it is still at ``expected_version`` and bump the version.
+
+        Returns ``None`` if the row does not exist and raises ``ConcurrentUpdateError``
+        when someone else updated it first. The update runs in a savepoint, a
+        conflict leaves the rest of the caller's transaction alone.
+        """
+        version = getattr(self.model, self.version_column)
+        async with self.session.begin_nested():
+            result = await self.session.execute(
+                update(self.model)
+                .where(self.primary_key == id, version == expected_version)
+                .values(**values, **{self.version_column: version + 1})
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                exists = await self.session.scalar(select(self.primary_key).where(self.primary_key == id))
+                if exists is None:
+                    return None
+                raise ConcurrentUpdateError(f"{self.model.__name__} {id} is not at version {expected_version}")
+        await self.session.commit()
+
+        return await self.session.get(self.model, id, populate_existing=True)
+
+
+def get_repository(repository_class: type[RepositoryT]) -> Callable[..., RepositoryT]:
+    """Build a FastAPI dependency that provides ``repository_class`` bound to the request session."""
+
+    def dependency(session: AsyncSession = Depends(get_async_session)) -> RepositoryT:
+        return repository_class(session)
+
+    return dependency
+
+
+def _batched(rows: Iterable[dict[str, Any]], batch_size: int) -> Iterable[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,41 @@
+import json
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.services.admission.service import AdmissionController, Rejected, RoutePriorities
+
+
+class AdmissionControlMiddleware:
+    """Fail fast with ``503`` and ``Retry-After`` instead of queueing without bound under overload."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, priorities: RoutePriorities):
+        self.app = app
+        self.controller = controller
+        self.priorities = priorities
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.priorities.classify(scope["method"], scope["path"])
+        try:
+            await self.controller.acquire(priority)
+        except Rejected as e:
+            body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,208 @@
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Optional
+
+from backend.services.monitoring.metrics import registry
+from backend.settings import settings
+
+# Highest priority first; "critical" traffic is never shed
+PRIORITIES = ("critical", "high", "normal", "low")
+
+admission_decisions_total = registry.counter(
+    "admission_decisions_total",
+    "Admission control decisions by priority class",
+)
+admission_queue_delay_seconds = registry.histogram(
+    "admission_queue_delay_seconds",
+    "Time requests waited for a concurrency slot",
+)
+admission_in_flight = registry.gauge("admission_in_flight", "Requests currently being processed")
+admission_queued = registry.gauge("admission_queued", "Requests waiting for a concurrency slot")
+admission_shed_level = registry.gauge(
+    "admission_shed_level",
+    "Number of lowest priority classes currently being shed",
+)
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Priority admission control with CoDel-style overload detection.
+
+    At most ``max_concurrency`` requests run at once; the rest wait in a
+    priority queue. Following CoDel, the controller watches the time requests
+    spend queued: if even the smallest delay stays above ``target_delay`` for a
+    whole ``interval`` the queue is a standing one, not a burst, and the lowest
+    priority class that is still admitted starts failing fast. Every further
+    interval of overload sheds the next class up, and the shedding stops as
+    soon as queueing delay drops below the target again.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = settings.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        target_delay: float = settings.ADMISSION_TARGET_DELAY_MS / 1000,
+        interval: float = settings.ADMISSION_INTERVAL_MS / 1000,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_delay = target_delay
+        self.interval = interval
+        self.in_flight = 0
+        self.shed_level = 0
+        # (rank, arrival sequence, enqueue time, future): FIFO within a priority class
+        self._queue: list[tuple[int, int, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._first_above_time: Optional[float] = None
+        self._next_escalation: Optional[float] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def is_shed(self, priority: str) -> bool:
+        rank = PRIORITIES.index(priority)
+        return rank > 0 and rank >= len(PRIORITIES) - self.shed_level
+
+    def retry_after(self) -> int:
+        # Rough time for the backlog to drain, at least a second
+        backlog = self.queued + self.in_flight
+        return max(1, math.ceil(backlog / max(self.max_concurrency, 1) * self.interval * (1 + self.shed_level)))
+
+    async def acquire(self, priority: str) -> None:
+        """Wait for a slot; raises ``Rejected`` when the request is shed."""
+        loop = asyncio.get_running_loop()
+        rank = PRIORITIES.index(priority)
+
+        if self.in_flight < self.max_concurrency and not self._queue:
+            self.in_flight += 1
+            self._observe_delay(0.0, loop.time())
+            self._admit(priority, 0.0)
+            return
+
+        if self.is_shed(priority):
+            self._reject(priority, "shed")
+        if len(self._queue) >= self.max_queue:
+            # A full queue evicts its lowest priority waiter for a more important request
+            lowest = max(self._queue)
+            if lowest[0] <= rank:
+                self._reject(priority, "queue_full")
+            self._queue.remove(lowest)
+            heapq.heapify(self._queue)
+            lowest[3].set_exception(Rejected("evicted", self.retry_after()))
+
+        future = loop.create_future()
+        enqueued_at = loop.time()
+        entry = (rank, next(self._sequence), enqueued_at, future)
+        heapq.heappush(self._queue, entry)
+        self._update_gauges()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not _handed_over(future):
+                self._discard(entry)
+                self._reject(priority, "timeout")
+        except Rejected as e:
+            self._reject(priority, e.reason)
+        except asyncio.CancelledError:
+            if _handed_over(future):
+                # The slot was handed over just as the client went away
+                self.release()
+            else:
+                self._discard(entry)
+            raise
+
+        self._admit(priority, loop.time() - enqueued_at)
+
+    def release(self) -> None:
+        now = asyncio.get_running_loop().time()
+        while self._queue:
+            rank, _, enqueued_at, future = heapq.heappop(self._queue)
+            if future.done():
+                continue
+            delay = now - enqueued_at
+            self._observe_delay(delay, now)
+            if delay >= self.target_delay and self.is_shed(PRIORITIES[rank]):
+                # CoDel drops at dequeue: waiters already queued are shed too
+                future.set_exception(Rejected("shed", self.retry_after()))
+                continue
+            # Hand the slot over directly, in_flight stays the same
+            future.set_result(None)
+            self._update_gauges()
+            return
+        self.in_flight -= 1
+        self._update_gauges()
+
+    def _admit(self, priority: str, delay: float) -> None:
+        admission_decisions_total.inc(priority=priority, decision="admitted")
+        admission_queue_delay_seconds.observe(delay, priority=priority)
+        self._update_gauges()
+
+    def _reject(self, priority: str, reason: str) -> None:
+        admission_decisions_total.inc(priority=priority, decision=reason)
+        raise Rejected(reason, self.retry_after())
+
+    def _discard(self, entry: tuple[int, int, float, asyncio.Future]) -> None:
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+        self._update_gauges()
+
+    def _observe_delay(self, delay: float, now: float) -> None:
+        if delay < self.target_delay or not self._queue:
+            # Below target (or the queue drained): no standing queue
+            self._first_above_time = None
+            self._next_escalation = None
+            self.shed_level = 0
+            return
+
+        if self._first_above_time is None:
+            self._first_above_time = now + self.interval
+        elif now >= self._first_above_time:
+            if self._next_escalation is None or now >= self._next_escalation:
+                self.shed_level = min(self.shed_level + 1, len(PRIORITIES) - 1)
+                self._next_escalation = now + self.interval
+
+    def _update_gauges(self) -> None:
+        admission_in_flight.set(self.in_flight)
+        admission_queued.set(len(self._queue))
+        admission_shed_level.set(self.shed_level)
+
+
+def _handed_over(future: asyncio.Future) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+class RoutePriorities:
+    """Map requests to priority classes by the longest matching ``"[METHOD ]/path-prefix"`` rule."""
+
+    def __init__(self, rules: dict[str, str], default: str = "normal"):
+        for priority in [*rules.values(), default]:
+            if priority not in PRIORITIES:
+                raise ValueError(f"Unknown priority class '{priority}', expected one of {PRIORITIES}")
+        self.default = default
+        self.rules: list[tuple[Optional[str], str, str]] = []
+        for pattern, priority in rules.items():
+            method, _, prefix = pattern.strip().rpartition(" ")
+            self.rules.append((method.upper() or None, prefix, priority))
+        # Longest prefix first, method-specific rules before catch-alls of the same prefix
+        self.rules.sort(key=lambda rule: (len(rule[1]), rule[0] is not None), reverse=True)
+
+    def classify(self, method: str, path: str) -> str:
+        for rule_method, prefix, priority in self.rules:
+            if rule_method is not None and rule_method != method:
+                continue
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return priority
+        return self.default
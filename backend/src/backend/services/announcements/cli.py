@@ -0,0 +1,29 @@
+import logging
+
+from backend.db import create_db_and_tables, engine
+from backend.services.announcements.service import announcement_sender
+
+logger = logging.getLogger(__name__)
+
+
+async def send_announcement(subject: str, body: str) -> None:
+    """Create an announcement and send it in the foreground."""
+    await create_db_and_tables()
+    try:
+        announcement = await announcement_sender.create(subject, body)
+        logger.info("Created announcement %s, resume it with `backend resume-announcement %s`", announcement.id, announcement.id)
+        await announcement_sender.run(announcement.id)
+    finally:
+        await engine.dispose()
+
+
+async def resume_announcement(announcement_id: int) -> None:
+    """Continue an interrupted announcement from its last checkpoint."""
+    try:
+        announcement = await announcement_sender.get(announcement_id)
+        if announcement is None:
+            raise SystemExit(f"Announcement {announcement_id} not found")
+        if await announcement_sender.run(announcement_id) is None:
+            raise SystemExit(f"Announcement {announcement_id} is already sent or another sender holds it")
+    finally:
+        await engine.dispose()
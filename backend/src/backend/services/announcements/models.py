@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text, Uuid
+
+from backend.clock import utcnow
+from backend.db import Base
+
+class Announcement(Base):
+    __tablename__ = "announcement"
+
+    id = Column(Integer, primary_key=True)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    # pending -> sending -> completed, a run that dies stays "sending" until its lease expires
+    status = Column(String(16), nullable=False, default="pending", index=True)
+    # Checkpoint: recipients go out in user id order, everyone up to this id has been handled
+    last_user_id = Column(Uuid, nullable=True)
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+    # The sender currently holding the announcement and until when its claim is valid
+    lease_owner = Column(String(36), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.clock import utcnow
+from backend.services.announcements.schemas import AnnouncementCreate, AnnouncementRead
+from backend.services.announcements.service import announcement_sender
+from backend.services.auth.utils import current_superuser
+
+router = APIRouter(prefix="/announcements", dependencies=[Depends(current_superuser)])
+
+@router.post("", response_model=AnnouncementRead, status_code=202)
+async def create_announcement(announcement: AnnouncementCreate):
+    """Email an announcement to all verified users, sending continues in the background."""
+    created = await announcement_sender.create(announcement.subject, announcement.body)
+    announcement_sender.start(created.id)
+    return created
+
+@router.get("", response_model=list[AnnouncementRead])
+async def list_announcements(limit: int = Query(50, ge=1, le=500)):
+    return await announcement_sender.list_recent(limit=limit)
+
+@router.get("/{announcement_id}", response_model=AnnouncementRead)
+async def get_announcement(announcement_id: int):
+    announcement = await announcement_sender.get(announcement_id)
+    if announcement is None:
+        raise HTTPException(status_code=404, detail="Announcement not found")
+    return announcement
+
+@router.post("/{announcement_id}/resume", response_model=AnnouncementRead, status_code=202)
+async def resume_announcement(announcement_id: int):
+    """Continue an interrupted announcement from its last checkpoint."""
+    announcement = await announcement_sender.get(announcement_id)
+    if announcement is None:
+        raise HTTPException(status_code=404, detail="Announcement not found")
+    if announcement.status == "completed":
+        raise HTTPException(status_code=409, detail="Announcement was already sent")
+    if announcement.lease_expires_at is not None and announcement.lease_expires_at > utcnow():
+        raise HTTPException(status_code=409, detail="Announcement is being sent")
+    announcement_sender.start(announcement_id)
+    return announcement
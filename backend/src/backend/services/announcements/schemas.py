@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class AnnouncementCreate(BaseModel):
+    subject: str = Field(min_length=1, max_length=255)
+    # Plain text, blank lines separate paragraphs
+    body: str = Field(min_length=1)
+
+class AnnouncementRead(BaseModel):
+    id: int
+    subject: str
+    status: str
+    sent_count: int
+    failed_count: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
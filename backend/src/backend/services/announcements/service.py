@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Optional
+
+from jinja2 import Template
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.clock import utcnow
+from backend.db import async_session_maker
+from backend.services.announcements.models import Announcement
+from backend.services.email.bulk import BulkTransport, OutgoingEmail
+from backend.services.email.service import email_service
+from backend.services.monitoring.metrics import registry
+from backend.services.monitoring.tracing import current_span, tracer
+from backend.services.users.models import User
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Progress is logged every N checkpoints
+_PROGRESS_EVERY = 10
+
+announcement_emails_total = registry.counter(
+    "announcement_emails_total",
+    "Announcement emails handed to the provider, by result",
+)
+
+
+class LeaseLost(Exception):
+    """Raised when another sender took over the announcement."""
+
+
+@dataclass
+class _Batch:
+    after_user_id: Optional[uuid.UUID]
+    last_user_id: uuid.UUID
+    messages: list[OutgoingEmail]
+
+
+class AnnouncementSender:
+    """Email an announcement to every active, verified user.
+
+    Recipients are read in user id order with one short keyset query per batch,
+    so memory stays flat however many users there are and no transaction stays
+    open while mail goes out. The next batch is fetched and rendered (in a worker
+    thread) while the current one is being delivered.
+
+    Every delivered batch is checkpointed by committing its last user id, and
+    each checkpoint renews the run's lease on the announcement. When a process
+    dies its lease runs out and the next run (on startup, or through the resume
+    endpoint or CLI) continues after the checkpoint. Only the batch in flight at
+    the moment of a crash can go out twice, and Resend drops even that through
+    the batch's idempotency key. A cancelled run finishes and checkpoints its
+    in-flight batch before stopping.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        transport_factory: Callable[[], BulkTransport] = email_service.create_bulk_transport,
+        batch_size: int = settings.ANNOUNCEMENT_BATCH_SIZE,
+        lease_seconds: int = settings.ANNOUNCEMENT_LEASE_SECONDS,
+    ):
+        self.session_maker = session_maker
+        self.transport_factory = transport_factory
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def create(self, subject: str, body: str) -> Announcement:
+        async with self.session_maker() as session:
+            announcement = Announcement(subject=subject, body=body)
+            session.add(announcement)
+            await session.commit()
+            await session.refresh(announcement)
+            return announcement
+
+    async def get(self, announcement_id: int) -> Optional[Announcement]:
+        async with self.session_maker() as session:
+            return await session.get(Announcement, announcement_id)
+
+    async def list_recent(self, limit: int = 50) -> list[Announcement]:
+        async with self.session_maker() as session:
+            result = await session.execute(select(Announcement).order_by(Announcement.id.desc()).limit(limit))
+            return list(result.scalars())
+
+    def start(self, announcement_id: int) -> None:
+        """Send in the background unless this process is already sending it."""
+        task = self._tasks.get(announcement_id)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self.run(announcement_id), name=f"announcement-{announcement_id}")
+        self._tasks[announcement_id] = task
+        task.add_done_callback(lambda _: self._forget(announcement_id, task))
+
+    async def resume_pending(self) -> list[int]:
+        """Start every unfinished announcement that no live sender holds."""
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(Announcement.id).where(
+                    Announcement.status.in_(("pending", "sending")),
+                    or_(Announcement.lease_expires_at.is_(None), Announcement.lease_expires_at < utcnow()),
+                )
+            )
+            announcement_ids = list(result.scalars())
+        for announcement_id in announcement_ids:
+            self.start(announcement_id)
+        return announcement_ids
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, announcement_id: int) -> Optional[Announcement]:
+        """Send the announcement, returns ``None`` if it is finished or another sender holds it."""
+        # Each batch is a trace of its own rather than part of the request that started the send
+        current_span.set(None)
+        owner = str(uuid.uuid4())
+        announcement = await self._claim(announcement_id, owner)
+        if announcement is None:
+            return None
+
+        transport = None
+        try:
+            transport = self.transport_factory()
+            await self._send_all(announcement, owner, transport)
+        except LeaseLost:
+            logger.warning("Announcement %s was taken over by another sender", announcement_id)
+            return None
+        except asyncio.CancelledError:
+            await self._release(announcement_id, owner)
+            raise
+        except Exception as e:
+            await self._release(announcement_id, owner, error=str(e))
+            raise
+        finally:
+            if transport is not None:
+                await transport.close()
+
+        return await self._finish(announcement_id, owner)
+
+    async def _send_all(self, announcement: Announcement, owner: str, transport: BulkTransport) -> None:
+        template = email_service.jinja_env.get_template("announcement_email.html")
+        paragraphs = [paragraph.strip() for paragraph in announcement.body.split("\n\n") if paragraph.strip()]
+
+        next_batch = asyncio.create_task(self._prepare(announcement, template, paragraphs, announcement.last_user_id))
+        checkpoints = sent_total = 0
+        try:
+            while (batch := await next_batch) is not None:
+                next_batch = asyncio.create_task(self._prepare(announcement, template, paragraphs, batch.last_user_id))
+                key = f"announcement-{announcement.id}/{batch.after_user_id}/{batch.last_user_id}"
+                attributes = {"announcement.id": announcement.id, "announcement.batch_size": len(batch.messages)}
+                with tracer.start_span("announcement.batch", attributes=attributes):
+                    delivery = asyncio.ensure_future(transport.send_batch(batch.messages, key))
+                    try:
+                        results = await asyncio.shield(delivery)
+                    except asyncio.CancelledError:
+                        # Checkpoint the batch in flight rather than send it again on resume
+                        await self._checkpoint(announcement.id, owner, batch, await delivery)
+                        raise
+                    sent_total += await self._checkpoint(announcement.id, owner, batch, results)
+
+                checkpoints += 1
+                if checkpoints % _PROGRESS_EVERY == 0:
+                    logger.info("Announcement %s: %d emails sent by this run", announcement.id, sent_total)
+        finally:
+            if not next_batch.cancel() and not next_batch.cancelled():
+                next_batch.exception()
+
+    async def _prepare(
+        self,
+        announcement: Announcement,
+        template: Template,
+        paragraphs: list[str],
+        after_user_id: Optional[uuid.UUID],
+    ) -> Optional[_Batch]:
+        statement = (
+            select(User.id, User.email)
+            .where(User.is_active, User.is_verified)
+            .order_by(User.id)
+            .limit(self.batch_size)
+        )
+        if after_user_id is not None:
+            statement = statement.where(User.id > after_user_id)
+        async with self.session_maker() as session:
+            recipients = (await session.execute(statement)).all()
+        if not recipients:
+            return None
+
+        def render() -> list[OutgoingEmail]:
+            return [
+                OutgoingEmail(
+                    to=email,
+                    subject=announcement.subject,
+                    html=template.render(
+                        subject=announcement.subject,
+                        paragraphs=paragraphs,
+                        recipient_email=email,
+                        app_name=settings.MAIL_FROM_NAME,
+                        app_link=settings.FRONTEND_URL,
+                    ),
+                )
+                for _, email in recipients
+            ]
+
+        # Rendering is CPU work, keep it off the event loop
+        messages = await asyncio.to_thread(render)
+        return _Batch(after_user_id=after_user_id, last_user_id=recipients[-1].id, messages=messages)
+
+    async def _claim(self, announcement_id: int, owner: str) -> Optional[Announcement]:
+        now = utcnow()
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(Announcement)
+                .where(
+                    Announcement.id == announcement_id,
+                    Announcement.status.in_(("pending", "sending")),
+                    or_(Announcement.lease_expires_at.is_(None), Announcement.lease_expires_at < now),
+                )
+                .values(
+                    status="sending",
+                    lease_owner=owner,
+                    lease_expires_at=now + self.lease,
+                    started_at=func.coalesce(Announcement.started_at, now),
+                    last_error=None,
+                )
+            )
+            await session.commit()
+            if result.rowcount != 1:
+                return None
+            return await session.get(Announcement, announcement_id)
+
+    async def _checkpoint(self, announcement_id: int, owner: str, batch: _Batch, results: list[Optional[str]]) -> int:
+        failed = 0
+        for message, error in zip(batch.messages, results):
+            if error is not None:
+                failed += 1
+                logger.warning("Announcement %s to %s was rejected: %s", announcement_id, message.to, error)
+        sent = len(results) - failed
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(Announcement)
+                .where(Announcement.id == announcement_id, Announcement.lease_owner == owner)
+                .values(
+                    last_user_id=batch.last_user_id,
+                    sent_count=Announcement.sent_count + sent,
+                    failed_count=Announcement.failed_count + failed,
+                    lease_expires_at=utcnow() + self.lease,
+                )
+            )
+            await session.commit()
+
+        announcement_emails_total.inc(sent, result="sent")
+        announcement_emails_total.inc(failed, result="rejected")
+        if result.rowcount != 1:
+            raise LeaseLost()
+        return sent
+
+    async def _release(self, announcement_id: int, owner: str, error: Optional[str] = None) -> None:
+        # Still "sending", so the next resume picks it up from the checkpoint
+        async with self.session_maker() as session:
+            await session.execute(
+                update(Announcement)
+                .where(Announcement.id == announcement_id, Announcement.lease_owner == owner)
+                .values(lease_owner=None, lease_expires_at=None, last_error=error)
+            )
+            await session.commit()
+
+    async def _finish(self, announcement_id: int, owner: str) -> Optional[Announcement]:
+        async with self.session_maker() as session:
+            result = await session.execute(
+                update(Announcement)
+                .where(Announcement.id == announcement_id, Announcement.lease_owner == owner)
+                .values(status="completed", finished_at=utcnow(), lease_owner=None, lease_expires_at=None)
+            )
+            await session.commit()
+            if result.rowcount != 1:
+                # The lease ran out after the last checkpoint and another sender holds it now
+                logger.warning("Announcement %s was taken over by another sender before completing", announcement_id)
+                return None
+            announcement = await session.get(Announcement, announcement_id)
+        logger.info(
+            "Announcement %s completed: %d sent, %d rejected",
+            announcement_id,
+            announcement.sent_count,
+            announcement.failed_count,
+        )
+        return announcement
+
+    def _forget(self, announcement_id: int, task: asyncio.Task) -> None:
+        if self._tasks.get(announcement_id) is task:
+            del self._tasks[announcement_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Announcement %s stopped: %s", announcement_id, task.exception())
+
+
+announcement_sender = AnnouncementSender()
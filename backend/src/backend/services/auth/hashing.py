@@ -0,0 +1,151 @@
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi_users.password import PasswordHelper
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from backend.settings import settings
+
+# OWASP's floor for argon2id memory, calibration never recommends less
+ARGON2_MIN_MEMORY_KIB = 19 * 1024
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+_CALIBRATION_PASSWORD = "correct horse battery staple"
+
+
+def build_password_helper() -> PasswordHelper:
+    """Password helper hashing with the configured algorithm and parameters.
+
+    Both algorithms stay available for verification, so hashes made with the
+    other algorithm or with older parameters keep working and are replaced on
+    the user's next login.
+    """
+    argon2 = Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+    bcrypt = BcryptHasher(rounds=settings.BCRYPT_ROUNDS)
+    if settings.PASSWORD_HASH_ALGORITHM == "argon2":
+        hashers = (argon2, bcrypt)
+    elif settings.PASSWORD_HASH_ALGORITHM == "bcrypt":
+        hashers = (bcrypt, argon2)
+    else:
+        raise ValueError(f"Unsupported password hash algorithm: {settings.PASSWORD_HASH_ALGORITHM}")
+    return PasswordHelper(PasswordHash(hashers))
+
+
+@dataclass
+class Measurement:
+    algorithm: str
+    parameters: dict[str, int]
+    median_ms: float
+    memory_kib: int
+
+    def describe(self) -> str:
+        parameters = ", ".join(f"{name}={value}" for name, value in self.parameters.items())
+        return f"{self.algorithm:<7} {parameters:<45} {self.median_ms:8.1f} ms {self.memory_kib / 1024:8.1f} MiB"
+
+
+def measure(hasher: Argon2Hasher | BcryptHasher, samples: int) -> float:
+    """Median milliseconds to hash (the cost of verifying is the same) after one warm-up run."""
+    hasher.hash(_CALIBRATION_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(_CALIBRATION_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_argon2(
+    target_ms: float,
+    max_memory_kib: int,
+    parallelism: int,
+    samples: int,
+    report: Callable[[Measurement], None] = lambda _: None,
+) -> Optional[Measurement]:
+    """Most expensive argon2id parameters that stay within ``target_ms`` and ``max_memory_kib``.
+
+    Memory is what makes argon2 costly to attack, so it is kept as high as the
+    budget allows and the time cost is then raised until the target latency is
+    reached. Memory is only halved when a single pass is already too slow.
+    """
+    memory_kib = max_memory_kib
+    while memory_kib >= ARGON2_MIN_MEMORY_KIB:
+        best = None
+        time_cost = 1
+        while True:
+            parameters = {"time_cost": time_cost, "memory_cost_kib": memory_kib, "parallelism": parallelism}
+            median_ms = measure(
+                Argon2Hasher(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism), samples
+            )
+            measurement = Measurement("argon2", parameters, median_ms, memory_kib)
+            report(measurement)
+            if median_ms > target_ms:
+                break
+            best = measurement
+            time_cost += 1
+        if best is not None:
+            return best
+        memory_kib //= 2
+    return None
+
+
+def calibrate_bcrypt(
+    target_ms: float,
+    samples: int,
+    report: Callable[[Measurement], None] = lambda _: None,
+) -> Optional[Measurement]:
+    """Highest bcrypt cost factor that stays within ``target_ms``, each round doubles the work."""
+    best = None
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        # bcrypt's state is a fixed 4 KiB
+        measurement = Measurement("bcrypt", {"rounds": rounds}, measure(BcryptHasher(rounds=rounds), samples), 4)
+        report(measurement)
+        if measurement.median_ms > target_ms:
+            break
+        best = measurement
+    return best
+
+
+def recommended_settings(measurement: Measurement) -> dict[str, str]:
+    if measurement.algorithm == "argon2":
+        return {
+            "PASSWORD_HASH_ALGORITHM": "argon2",
+            "ARGON2_TIME_COST": str(measurement.parameters["time_cost"]),
+            "ARGON2_MEMORY_COST_KIB": str(measurement.parameters["memory_cost_kib"]),
+            "ARGON2_PARALLELISM": str(measurement.parameters["parallelism"]),
+        }
+    return {"PASSWORD_HASH_ALGORITHM": "bcrypt", "BCRYPT_ROUNDS": str(measurement.parameters["rounds"])}
+
+
+def calibrate(algorithm: str, target_ms: float, max_memory_mib: int, parallelism: int, samples: int) -> None:
+    """Benchmark hash parameters on this machine and print the settings to use."""
+    if algorithm == "argon2":
+        print(f"Calibrating argon2 for {target_ms:.0f} ms per hash, at most {max_memory_mib} MiB\n")
+        best = calibrate_argon2(target_ms, max_memory_mib * 1024, parallelism, samples, report=_print_measurement)
+    else:
+        print(f"Calibrating bcrypt for {target_ms:.0f} ms per hash\n")
+        best = calibrate_bcrypt(target_ms, samples, report=_print_measurement)
+
+    if best is None:
+        print(f"\nNo {algorithm} parameters fit in {target_ms:.0f} ms on this machine, raise the target latency")
+        return
+
+    print(f"\nRecommended ({best.median_ms:.0f} ms per hash):\n")
+    for name, value in recommended_settings(best).items():
+        current = getattr(settings, name)
+        note = "" if str(current) == value else f"  # currently {current}"
+        print(f"{name}={value}{note}")
+    if best.algorithm == "argon2":
+        print(f"\nEach concurrent login needs {best.memory_kib / 1024:.0f} MiB, size worker memory accordingly.")
+
+
+def _print_measurement(measurement: Measurement) -> None:
+    print(measurement.describe())
@@ -20,3 +20,4 @@ fastapi_users = FastAPIUsers[User, uuid.UUID](
     [auth_backend],
 )
 
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Optional, Protocol
+
+import aiosmtplib
+import httpx
+from fastapi_mail import ConnectionConfig
+
+from backend.services.monitoring.tracing import SPAN_KIND_CLIENT, TracingTransport, tracer
+
+logger = logging.getLogger(__name__)
+
+RESEND_BATCH_URL = "https://api.resend.com/emails/batch"
+# Resend rejects batch calls with more emails than this
+RESEND_MAX_BATCH_SIZE = 100
+_MAX_RETRIES = 3
+
+
+class BulkDeliveryError(Exception):
+    """Raised when the provider cannot take messages at all, as opposed to rejecting one recipient."""
+
+
+@dataclass
+class OutgoingEmail:
+    to: str
+    subject: str
+    html: str
+
+
+class BulkTransport(Protocol):
+    async def send_batch(self, messages: list[OutgoingEmail], idempotency_key: str) -> list[Optional[str]]:
+        """Deliver ``messages``, returning an error message (or ``None``) per message in order."""
+        ...
+
+    async def close(self) -> None: ...
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` acquisitions per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SMTPPoolTransport:
+    """Send over at most ``pool_size`` reused SMTP connections.
+
+    Connections are opened lazily and kept for the whole run instead of one
+    connect/login/quit per message. A recipient the server refuses is reported
+    as a failure for that message only; losing the connection twice in a row
+    means the server is gone and raises ``BulkDeliveryError``.
+    """
+
+    def __init__(self, config: ConnectionConfig, pool_size: int, rate_per_second: float):
+        self.config = config
+        self.pool_size = pool_size
+        self.limiter = RateLimiter(rate_per_second)
+        self._idle: asyncio.Queue[aiosmtplib.SMTP] = asyncio.Queue()
+        self._opened = 0
+        self._sender = formataddr((config.MAIL_FROM_NAME or "", str(config.MAIL_FROM)))
+
+    async def send_batch(self, messages: list[OutgoingEmail], idempotency_key: str) -> list[Optional[str]]:
+        # SMTP has no idempotency keys, the caller's checkpoints are all we have
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(self._send(message)) for message in messages]
+        except ExceptionGroup as failures:
+            # The group has cancelled and awaited the other sends, some of them waiting for a connection
+            raise failures.exceptions[0]
+        return [task.result() for task in tasks]
+
+    async def _send(self, message: OutgoingEmail) -> Optional[str]:
+        email = EmailMessage()
+        email["From"] = self._sender
+        email["To"] = message.to
+        email["Subject"] = message.subject
+        email.set_content(message.html, subtype="html")
+
+        await self.limiter.acquire()
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                with tracer.start_span("smtp send", SPAN_KIND_CLIENT, {"server.address": self.config.MAIL_SERVER}):
+                    await connection.send_message(email)
+            except aiosmtplib.SMTPRecipientsRefused as e:
+                self._idle.put_nowait(connection)
+                return "; ".join(f"{refused.code} {refused.message}" for refused in e.recipients)
+            except aiosmtplib.SMTPResponseException as e:
+                self._idle.put_nowait(connection)
+                if e.code == 421:
+                    # Service shutting down, not a problem with this recipient
+                    raise BulkDeliveryError(f"SMTP server is not accepting mail: {e.message}") from e
+                return f"{e.code} {e.message}"
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, OSError) as e:
+                self._opened -= 1
+                if attempt:
+                    raise BulkDeliveryError(f"Lost connection to the SMTP server: {e}") from e
+                logger.info("SMTP connection dropped, reconnecting: %s", e)
+            else:
+                self._idle.put_nowait(connection)
+                return None
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        if self._idle.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            try:
+                return await self._connect()
+            except Exception as e:
+                self._opened -= 1
+                raise BulkDeliveryError(f"Could not connect to the SMTP server: {e}") from e
+        return await self._idle.get()
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        connection = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+        )
+        await connection.connect()
+        if self.config.USE_CREDENTIALS:
+            await connection.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        return connection
+
+    async def close(self) -> None:
+        while not self._idle.empty():
+            connection = self._idle.get_nowait()
+            try:
+                await connection.quit()
+            except aiosmtplib.SMTPException:
+                connection.close()
+        self._opened = 0
+
+
+class ResendBatchTransport:
+    """Send through Resend's batch endpoint, up to 100 emails per request.
+
+    Every request carries an ``Idempotency-Key`` derived from the caller's key,
+    so a batch that is retried after a crash is not delivered twice.
+    """
+
+    def __init__(self, api_key: str, sender: str, requests_per_second: float):
+        self.sender = sender
+        self.limiter = RateLimiter(requests_per_second)
+        self.client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {api_key}"}, timeout=30, transport=TracingTransport()
+        )
+
+    async def send_batch(self, messages: list[OutgoingEmail], idempotency_key: str) -> list[Optional[str]]:
+        for start in range(0, len(messages), RESEND_MAX_BATCH_SIZE):
+            chunk = messages[start:start + RESEND_MAX_BATCH_SIZE]
+            await self._post(chunk, f"{idempotency_key}/{start}")
+        return [None] * len(messages)
+
+    async def _post(self, messages: list[OutgoingEmail], idempotency_key: str) -> None:
+        payload = [
+            {"from": self.sender, "to": [message.to], "subject": message.subject, "html": message.html}
+            for message in messages
+        ]
+        for attempt in range(_MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                response = await self.client.post(
+                    RESEND_BATCH_URL, json=payload, headers={"Idempotency-Key": idempotency_key}
+                )
+            except httpx.TransportError as e:
+                if attempt == _MAX_RETRIES:
+                    raise BulkDeliveryError(f"Could not reach Resend: {e}") from e
+                await asyncio.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 200:
+                return
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == _MAX_RETRIES:
+                    break
+                await asyncio.sleep(float(response.headers.get("retry-after", 2 ** attempt)))
+                continue
+            break
+        raise BulkDeliveryError(f"Resend rejected the batch: {response.status_code} {response.text}")
+
+    async def close(self) -> None:
+        await self.client.aclose()
@@ -6,6 +6,8 @@ from jinja2 import Environment, FileSystemLoader
 import pathlib
 import httpx
 
+from backend.services.email.bulk import BulkDeliveryError, BulkTransport, ResendBatchTransport, SMTPPoolTransport
+from backend.services.monitoring.tracing import SPAN_KIND_CLIENT, TracingTransport, tracer
 from backend.settings import settings
 
 
@@ -60,6 +62,7 @@ class EmailService:
         
         self.fastmail = FastMail(self.mail_config)
 
+    @tracer.traced("email.send_verification")
     async def send_verification_email(self, email: str, token: str, user_name: str = "User"):
         """Send email verification email"""
         try:
@@ -90,13 +93,14 @@ class EmailService:
                     subtype=MessageType.html
                 )
                 
-                await self.fastmail.send_message(message)
+                await self._send_with_smtp(message)
                 
         except Exception as e:
             print(f"Failed to send verification email to {email}: {str(e)}")
             # Don't raise exception to prevent registration failure
             # In production, you might want to log this properly
 
+    @tracer.traced("email.send_welcome")
     async def send_welcome_email(self, email: str, user_name: str = "User"):
         """Send welcome email after successful verification"""
         try:
@@ -126,11 +130,34 @@ class EmailService:
                     subtype=MessageType.html
                 )
                 
-                await self.fastmail.send_message(message)
+                await self._send_with_smtp(message)
                 
         except Exception as e:
             print(f"Failed to send welcome email to {email}: {str(e)}")
 
+    def create_bulk_transport(self) -> BulkTransport:
+        """Transport for bulk sends: Resend's batch API or a pool of SMTP connections"""
+        if settings.EMAIL_PROVIDER == "resend":
+            if not settings.RESEND_API_KEY:
+                raise BulkDeliveryError("Resend API key not configured")
+            return ResendBatchTransport(
+                api_key=settings.RESEND_API_KEY,
+                sender=f"{settings.MAIL_FROM_NAME} <{settings.MAIL_FROM}>",
+                requests_per_second=settings.ANNOUNCEMENT_RESEND_REQUESTS_PER_SECOND,
+            )
+        return SMTPPoolTransport(
+            self.mail_config,
+            pool_size=settings.ANNOUNCEMENT_SMTP_POOL_SIZE,
+            rate_per_second=settings.ANNOUNCEMENT_SMTP_RATE_PER_SECOND,
+        )
+
+    async def _send_with_smtp(self, message: MessageSchema):
+        """Send email using FastMail over SMTP"""
+        attributes = {"server.address": self.mail_config.MAIL_SERVER, "server.port": self.mail_config.MAIL_PORT}
+        with tracer.start_span("smtp send", SPAN_KIND_CLIENT, attributes):
+            await self.fastmail.send_message(message)
+
+    @tracer.traced("email.send_with_resend")
     async def _send_with_resend(self, to_email: str, subject: str, template_name: str, template_data: dict):
         """Send email using Resend API"""
         if not settings.RESEND_API_KEY:
@@ -139,7 +166,7 @@ class EmailService:
         template = self.jinja_env.get_template(template_name)
         html_content = template.render(**template_data)
         
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=TracingTransport()) as client:
             response = await client.post(
                 "https://api.resend.com/emails",
                 headers={
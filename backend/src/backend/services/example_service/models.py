@@ -1,9 +1,11 @@
-# from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String
 
-# from backend.db import Base
+from backend.db import Base
 
-# class ExampleModel(Base):
-#     __tablename__ = "example_model"
-#     id = Column(Integer, primary_key=True)
-#     name = Column(String)
-#     description = Column(String)
+class ExampleModel(Base):
+    __tablename__ = "example_model"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    description = Column(String)
+    # Bumped on every update, see AsyncRepository.update_versioned
+    version = Column(Integer, nullable=False, default=1)
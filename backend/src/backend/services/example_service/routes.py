@@ -1,17 +1,57 @@
-# from fastapi import APIRouter, Depends
-# from backend.services.example_service.schemas import ExampleSchema, ExampleCreate
-# from backend.services.example_service.service import ExampleService
-# from backend.db import get_async_session
-# from sqlalchemy.ext.asyncio import AsyncSession
-
-# router = APIRouter()
-
-# @router.get("/example", response_model=ExampleSchema)
-# async def get_example(db: AsyncSession = Depends(get_async_session)):
-#     service = ExampleService()
-#     return service.get_example()
-
-# @router.post("/example", response_model=ExampleSchema)
-# async def create_example(example: ExampleCreate, db: AsyncSession = Depends(get_async_session)):
-#     service = ExampleService()
-#     return service.create_example(db, example.model_dump())
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.repository import ConcurrentUpdateError, get_repository
+from backend.services.example_service.schemas import ExampleCreate, ExamplePage, ExampleSchema, ExampleUpdate
+from backend.services.example_service.service import ExampleService
+
+router = APIRouter()
+
+get_example_service = get_repository(ExampleService)
+
+@router.get("/example", response_model=ExamplePage)
+async def list_examples(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    service: ExampleService = Depends(get_example_service),
+):
+    try:
+        page = await service.paginate(limit=limit, cursor=cursor, columns=["name", "description", "version"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ExamplePage(items=page.items, next_cursor=page.next_cursor)
+
+@router.get("/example/{example_id}", response_model=ExampleSchema)
+async def get_example(example_id: int, service: ExampleService = Depends(get_example_service)):
+    example = await service.get_example_by_id(example_id)
+    if example is None:
+        raise HTTPException(status_code=404, detail="Example not found")
+    return example
+
+@router.post("/example", response_model=ExampleSchema)
+async def create_example(example: ExampleCreate, service: ExampleService = Depends(get_example_service)):
+    return await service.create_example(example.model_dump())
+
+@router.post("/example/bulk")
+async def import_examples(examples: list[ExampleCreate], service: ExampleService = Depends(get_example_service)):
+    count = await service.import_examples([example.model_dump() for example in examples])
+    return {"count": count}
+
+@router.patch("/example/{example_id}", response_model=ExampleSchema)
+async def update_example(
+    example_id: int,
+    example: ExampleUpdate,
+    service: ExampleService = Depends(get_example_service),
+):
+    try:
+        updated = await service.update_versioned(
+            example_id,
+            expected_version=example.version,
+            values=example.model_dump(exclude={"version"}, exclude_unset=True),
+        )
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Example not found")
+    return updated
@@ -1,11 +1,23 @@
-# from typing import Optional
-# from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel
 
-# class ExampleSchema(BaseModel):
-#     id: Optional[int] = None
-#     name: str
-#     description: str
+class ExampleSchema(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    version: int
 
-# class ExampleCreate(BaseModel):
-#     name: str
-#     description: str
+    model_config = {"from_attributes": True}
+
+class ExampleCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+
+class ExampleUpdate(BaseModel):
+    description: Optional[str] = None
+    # Version the client last read, the update is rejected if it changed since
+    version: int
+
+class ExamplePage(BaseModel):
+    items: list[ExampleSchema]
+    next_cursor: Optional[str] = None
@@ -1,20 +1,19 @@
-# from sqlalchemy import select
-# from backend.services.example_service.models import ExampleModel
+from backend.repository import AsyncRepository
+from backend.services.example_service.models import ExampleModel
 
-# class ExampleService:
-#     def __init__(self):
-#         pass
+class ExampleService(AsyncRepository[ExampleModel]):
+    model = ExampleModel
 
-#     def get_example(self):
-#         # This is just a placeholder. In a real app, you'd use the session to query data
-#         return {"message": "Hello, World!"}
-    
-#     def get_example_by_id(self, session, example_id: int):
-#         return session.exec(select(ExampleModel).where(ExampleModel.id == example_id)).first()
-    
-#     def create_example(self, session, example_data):
-#         db_example = ExampleModel(**example_data)
-#         session.add(db_example)
-#         session.commit()
-#         session.refresh(db_example)
-#         return db_example
+    async def get_example(self):
+        # This is just a placeholder. In a real app, you'd use the session to query data
+        return {"message": "Hello, World!"}
+
+    async def get_example_by_id(self, example_id: int):
+        return await self.get(example_id)
+
+    async def create_example(self, example_data: dict):
+        return await self.create(example_data)
+
+    async def import_examples(self, examples: list[dict]) -> int:
+        # One INSERT ... ON CONFLICT per batch instead of a round trip per row
+        return await self.bulk_upsert(examples, index_elements=["name"], update_columns=["description"])
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Response
+
+from backend.services.health.schemas import ReadinessRead
+from backend.services.health.service import warm_up
+
+router = APIRouter(prefix="/health")
+
+@router.get("/live")
+async def live():
+    """The process is up and serving requests."""
+    return {"status": "ok"}
+
+@router.get("/ready", response_model=ReadinessRead)
+async def ready(response: Response):
+    """503 until the warm-up has finished and while the database is unreachable."""
+    is_ready = await warm_up.is_ready()
+    if not is_ready:
+        response.status_code = 503
+    return ReadinessRead(ready=is_ready, warm_up=warm_up.steps)
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class WarmUpStepRead(BaseModel):
+    name: str
+    duration_ms: float
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+class ReadinessRead(BaseModel):
+    ready: bool
+    warm_up: list[WarmUpStepRead]
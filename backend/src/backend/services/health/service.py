@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI
+from fastapi_users.db import SQLAlchemyUserDatabase
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from backend.db import engine
+from backend.services.email.service import email_service
+from backend.services.users.models import User
+from backend.services.users.service import password_helper
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Lookups that miss on purpose: only the statement matters, not the row
+_WARMUP_EMAIL = "warm-up@example.invalid"
+_WARMUP_USER_ID = uuid.UUID(int=0)
+
+
+@dataclass
+class WarmUpStep:
+    name: str
+    duration_ms: float
+    error: Optional[str] = None
+
+
+class WarmUp:
+    """Pay a fresh worker's one-off costs before it reports ready.
+
+    Opens and primes database connections (so the user lookups of the auth
+    path are compiled, and prepared on PostgreSQL, on every pooled
+    connection), compiles the email templates, initializes the password hasher
+    with one dummy hash and builds the OpenAPI schema. A failing step is logged
+    and leaves its path cold; it does not keep the worker from starting.
+    """
+
+    def __init__(self, engine: AsyncEngine = engine, connections: int = settings.WARMUP_DB_CONNECTIONS):
+        self.engine = engine
+        self.connections = connections
+        self.finished = False
+        self.steps: list[WarmUpStep] = []
+
+    async def run(self, app: FastAPI) -> None:
+        self.finished = False
+        self.steps = []
+        await self._step("database_connections", self._prime_connections)
+        await self._step("email_templates", self._compile_templates)
+        await self._step("password_hash", self._hash_password)
+        await self._step("openapi_schema", lambda: self._build_openapi(app))
+        self.finished = True
+        logger.info("Warm-up finished in %.0f ms", sum(step.duration_ms for step in self.steps))
+
+    def skip(self) -> None:
+        self.finished = True
+
+    async def is_ready(self) -> bool:
+        if not self.finished:
+            return False
+        try:
+            async with self.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+        except Exception as e:
+            logger.warning("Readiness check could not reach the database: %s", e)
+            return False
+        return True
+
+    async def _step(self, name: str, fn: Callable[[], Awaitable[None]]) -> None:
+        start = time.perf_counter()
+        error = None
+        try:
+            await fn()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+            error = str(e)
+        self.steps.append(WarmUpStep(name=name, duration_ms=(time.perf_counter() - start) * 1000, error=error))
+
+    async def _prime_connections(self) -> None:
+        # Connections beyond the pool size are closed on release, opening them would be wasted
+        pool_size = getattr(self.engine.pool, "size", lambda: 1)()
+        async with AsyncExitStack() as stack:
+            for _ in range(min(self.connections, pool_size)):
+                connection = await stack.enter_async_context(self.engine.connect())
+                await self._prime(connection)
+
+    @staticmethod
+    async def _prime(connection: AsyncConnection) -> None:
+        async with AsyncSession(bind=connection) as session:
+            user_db = SQLAlchemyUserDatabase(session, User)
+            await user_db.get_by_email(_WARMUP_EMAIL)
+            await user_db.get(_WARMUP_USER_ID)
+            # Identity lookup used by the coalescing user database
+            await session.get(User, _WARMUP_USER_ID)
+
+    async def _compile_templates(self) -> None:
+        for name in email_service.jinja_env.list_templates(extensions=["html"]):
+            email_service.jinja_env.get_template(name)
+
+    async def _hash_password(self) -> None:
+        await asyncio.to_thread(password_helper.hash, "warm-up")
+
+    async def _build_openapi(self, app: FastAPI) -> None:
+        app.openapi()
+
+
+warm_up = WarmUp()
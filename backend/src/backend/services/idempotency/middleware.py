@@ -0,0 +1,152 @@
+import hashlib
+import json
+from typing import Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.services.idempotency.service import (
+    IdempotencyConflict,
+    IdempotencyStore,
+    StoredResponse,
+)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = "idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for requests carrying an ``Idempotency-Key`` header.
+
+    Keys are scoped to the method, path, query string and ``Authorization``
+    header, so two clients cannot read each other's responses by reusing a key. Reusing a key
+    with a different request body is rejected with ``422``.
+
+    Paths under ``excluded_paths`` pass straight through: stored responses sit
+    in the database and in memory for the whole TTL, which must not happen to
+    login responses and the tokens in them.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: IdempotencyStore | None = None,
+        methods: Iterable[str] = ("POST",),
+        excluded_paths: Iterable[str] = (),
+    ):
+        self.app = app
+        self.store = store or IdempotencyStore()
+        self.methods = {method.upper() for method in methods}
+        self.excluded_paths = tuple(path.rstrip("/") for path in excluded_paths)
+
+    def _is_excluded(self, path: str) -> bool:
+        return any(path == excluded or path.startswith(excluded + "/") for excluded in self.excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods or self._is_excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        raw_key = headers.get(IDEMPOTENCY_HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = raw_key.decode("latin-1").strip()
+        if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_error(send, 400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            # Client went away mid-body, neither run nor record a truncated request
+            return
+        storage_key = _hash(
+            scope["method"].encode(),
+            scope["path"].encode(),
+            scope.get("query_string", b""),
+            headers.get(b"authorization", b""),
+            idempotency_key.encode(),
+        )
+        request_hash = _hash(body)
+
+        try:
+            response, replayed = await self.store.execute(
+                storage_key,
+                request_hash,
+                lambda: self._call_and_capture(scope, body, receive),
+            )
+        except IdempotencyConflict:
+            await _send_error(send, 409, "A request with this Idempotency-Key is still being processed")
+            return
+
+        if response.request_hash != request_hash:
+            await _send_error(send, 422, "Idempotency-Key was already used with a different request body")
+            return
+
+        response_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response.headers]
+        if replayed:
+            response_headers.append((REPLAYED_HEADER.encode(), b"true"))
+        await send({"type": "http.response.start", "status": response.status_code, "headers": response_headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def _call_and_capture(self, scope: Scope, body: bytes, receive: Receive) -> StoredResponse:
+        body_sent = False
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Only disconnects are left once the body has been consumed
+            return await receive()
+
+        status_code = 500
+        headers: list[tuple[str, str]] = []
+        chunks: list[bytes] = []
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, replay_receive, capture_send)
+        return StoredResponse(request_hash="", status_code=status_code, headers=headers, body=b"".join(chunks))
+
+
+async def _read_body(receive: Receive) -> bytes | None:
+    """The full request body, ``None`` if the client disconnected before sending all of it."""
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _hash(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+async def _send_error(send: Send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, JSON
+
+from backend.clock import utcnow
+from backend.db import Base
+
+class IdempotencyRecord(Base):
+    __tablename__ = "idempotency_key"
+
+    key = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    # Status, headers and body stay NULL while the first request is in flight
+    status_code = Column(Integer, nullable=True)
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
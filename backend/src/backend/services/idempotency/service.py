@@ -0,0 +1,257 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.clock import utcnow
+from backend.db import async_session_maker
+from backend.services.idempotency.models import IdempotencyRecord
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# How often a worker re-checks a key that another worker is processing
+_POLL_INTERVAL_SECONDS = 0.05
+_MAX_POLL_INTERVAL_SECONDS = 1.0
+# Expired rows are purged from the database every N stored responses
+_PURGE_EVERY = 100
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an in-flight request for the same key does not finish in time."""
+
+
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    headers: list[tuple[str, str]] = field(default_factory=list)
+    body: bytes = b""
+    expires_at: datetime = field(default_factory=utcnow)
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at <= utcnow()
+
+
+class IdempotencyStore:
+    """Bounded TTL store of responses keyed by idempotency key.
+
+    The database is the source of truth and is shared between workers; a small
+    LRU cache in front of it serves repeated retries without a query. Requests
+    for a key that is still being processed wait for the first result instead
+    of running the handler again.
+
+    The in-progress placeholder expires ``lock_timeout_seconds`` after its last
+    heartbeat, so a worker that dies mid-request frees the key, while a live
+    handler keeps it however long it runs.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+        ttl_seconds: int = settings.IDEMPOTENCY_TTL_SECONDS,
+        cache_size: int = settings.IDEMPOTENCY_CACHE_SIZE,
+        lock_timeout_seconds: float = settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS,
+    ):
+        self.session_maker = session_maker
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.cache_size = cache_size
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._cache: OrderedDict[str, StoredResponse] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Event] = {}
+        self._saves = 0
+
+    async def execute(
+        self,
+        key: str,
+        request_hash: str,
+        handler: Callable[[], Awaitable[StoredResponse]],
+    ) -> tuple[StoredResponse, bool]:
+        """Return the stored response for ``key`` or run ``handler`` exactly once.
+
+        The second element of the result is ``True`` when the response is a replay.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_timeout_seconds
+        poll_interval = _POLL_INTERVAL_SECONDS
+
+        while True:
+            stored = await self.get(key)
+            if stored is not None:
+                return stored, True
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise IdempotencyConflict(key)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                # Same worker: wait for the first request to finish, then re-check
+                try:
+                    await asyncio.wait_for(in_flight.wait(), remaining)
+                except asyncio.TimeoutError:
+                    raise IdempotencyConflict(key)
+                continue
+
+            done = asyncio.Event()
+            self._in_flight[key] = done
+            try:
+                placeholder_created_at = await self._acquire(key, request_hash)
+                if placeholder_created_at is None:
+                    # Another worker owns the key: poll until it stores a result
+                    await asyncio.sleep(min(poll_interval, remaining))
+                    poll_interval = min(poll_interval * 2, _MAX_POLL_INTERVAL_SECONDS)
+                    continue
+
+                heartbeat = asyncio.create_task(self._keep_alive(key, placeholder_created_at))
+                try:
+                    response = await handler()
+                except BaseException:
+                    await self._release(key)
+                    raise
+                finally:
+                    heartbeat.cancel()
+
+                response.request_hash = request_hash
+                response.expires_at = utcnow() + self.ttl
+                if response.status_code >= 500:
+                    # Server errors are not final, let the client retry for real
+                    await self._release(key)
+                else:
+                    await self._save(key, response)
+                return response, False
+            finally:
+                del self._in_flight[key]
+                done.set()
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        cached = self._cache.get(key)
+        if cached is not None:
+            if not cached.is_expired:
+                self._cache.move_to_end(key)
+                return cached
+            del self._cache[key]
+
+        async with self.session_maker() as session:
+            record = await session.get(IdempotencyRecord, key)
+
+        if record is None or record.status_code is None:
+            return None
+        if record.expires_at <= utcnow():
+            return None
+
+        stored = StoredResponse(
+            request_hash=record.request_hash,
+            status_code=record.status_code,
+            headers=[(name, value) for name, value in record.headers or []],
+            body=record.body or b"",
+            expires_at=record.expires_at,
+        )
+        self._remember(key, stored)
+        return stored
+
+    async def purge_expired(self) -> int:
+        """Delete expired records, returns the number of rows removed."""
+        now = utcnow()
+        for key in [k for k, v in self._cache.items() if v.expires_at <= now]:
+            del self._cache[key]
+
+        async with self.session_maker() as session:
+            result = await session.execute(
+                delete(IdempotencyRecord).where(IdempotencyRecord.expires_at <= now)
+            )
+            await session.commit()
+        return result.rowcount or 0
+
+    def _remember(self, key: str, stored: StoredResponse) -> None:
+        self._cache[key] = stored
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _acquire(self, key: str, request_hash: str) -> Optional[datetime]:
+        """Insert an in-progress placeholder, returns its ``created_at`` or ``None`` if the key is taken."""
+        now = utcnow()
+        async with self.session_maker() as session:
+            # An expired record must not block reuse of its key
+            await session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.expires_at <= now,
+                )
+            )
+            session.add(
+                IdempotencyRecord(
+                    key=key,
+                    request_hash=request_hash,
+                    created_at=now,
+                    # Placeholder expires on its own if this worker dies mid-request
+                    expires_at=now + timedelta(seconds=self.lock_timeout_seconds),
+                )
+            )
+            try:
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                return None
+        return now
+
+    async def _keep_alive(self, key: str, created_at: datetime) -> None:
+        """Push the placeholder's expiry forward while the handler runs, so no other worker takes the key."""
+        interval = self.lock_timeout_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with self.session_maker() as session:
+                    await session.execute(
+                        update(IdempotencyRecord)
+                        .where(
+                            IdempotencyRecord.key == key,
+                            # created_at tells our placeholder apart from one another worker made later
+                            IdempotencyRecord.created_at == created_at,
+                            IdempotencyRecord.status_code.is_(None),
+                        )
+                        .values(expires_at=utcnow() + timedelta(seconds=self.lock_timeout_seconds))
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Failed to extend the idempotency placeholder for %s", key)
+
+    async def _release(self, key: str) -> None:
+        async with self.session_maker() as session:
+            await session.execute(
+                delete(IdempotencyRecord).where(
+                    IdempotencyRecord.key == key,
+                    IdempotencyRecord.status_code.is_(None),
+                )
+            )
+            await session.commit()
+
+    async def _save(self, key: str, response: StoredResponse) -> None:
+        async with self.session_maker() as session:
+            record = await session.get(IdempotencyRecord, key)
+            if record is None:
+                record = IdempotencyRecord(key=key, created_at=utcnow())
+                session.add(record)
+            record.request_hash = response.request_hash
+            record.status_code = response.status_code
+            record.headers = [list(header) for header in response.headers]
+            record.body = response.body
+            record.expires_at = response.expires_at
+            await session.commit()
+        self._remember(key, response)
+
+        self._saves += 1
+        if self._saves % _PURGE_EVERY == 0:
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.exception("Failed to purge expired idempotency keys")
+
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import backend
+from backend.services.monitoring.metrics import registry
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a loop timer was due and when it ran",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+loop_blocked_total = registry.counter(
+    "event_loop_blocked_total",
+    "Times a single callback blocked the event loop longer than the threshold",
+)
+
+APPLICATION_ROOTS = (os.path.dirname(backend.__file__),)
+
+
+@dataclass
+class BlockingEvent:
+    started_at: datetime
+    stack: list[str]
+    # Innermost application frame, usually the blocking call site
+    location: str = "<unknown>"
+    # Filled in once the loop is responsive again
+    duration_seconds: Optional[float] = None
+
+
+def application_location(frames: traceback.StackSummary, roots: Iterable[str]) -> str:
+    """Innermost frame under one of ``roots``, or the innermost frame when none is."""
+    roots = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+    for frame in reversed(frames):
+        if os.path.abspath(frame.filename).startswith(roots):
+            break
+    else:
+        if not frames:
+            return "<unknown>"
+        frame = frames[-1]
+    return f'File "{frame.filename}", line {frame.lineno}, in {frame.name}'
+
+
+class LoopMonitor:
+    """Measure event-loop lag and catch callbacks that block the loop.
+
+    A task on the loop wakes up every ``interval`` seconds and records how late
+    it was scheduled. A watchdog thread watches the task's heartbeat; when it
+    goes stale for longer than ``blocking_threshold`` the loop thread is stuck
+    in one callback, so the watchdog captures that thread's current stack.
+    """
+
+    def __init__(
+        self,
+        interval: float = settings.LOOP_MONITOR_INTERVAL_MS / 1000,
+        blocking_threshold: float = settings.LOOP_BLOCKING_THRESHOLD_MS / 1000,
+        max_events: int = 50,
+        application_roots: Iterable[str] = APPLICATION_ROOTS,
+    ):
+        self.interval = interval
+        self.blocking_threshold = blocking_threshold
+        self.application_roots = tuple(application_roots)
+        self.events: deque[BlockingEvent] = deque(maxlen=max_events)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure_lag(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _measure_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            loop_lag_seconds.observe(max(0.0, loop.time() - expected))
+            self._heartbeat = time.monotonic()
+
+    def _watch(self) -> None:
+        poll_interval = min(self.blocking_threshold / 4, 0.05)
+        current: Optional[BlockingEvent] = None
+        stalled_heartbeat = 0.0
+
+        while not self._stopping.wait(poll_interval):
+            heartbeat = self._heartbeat
+            if current is not None:
+                if heartbeat != stalled_heartbeat:
+                    # Loop is responsive again, the gap between heartbeats is the block
+                    current.duration_seconds = max(0.0, heartbeat - stalled_heartbeat - self.interval)
+                    logger.warning(
+                        "Event loop was blocked for %.0f ms at %s",
+                        current.duration_seconds * 1000,
+                        current.location,
+                    )
+                    current = None
+                continue
+
+            if time.monotonic() - heartbeat > self.interval + self.blocking_threshold:
+                current = self._capture()
+                stalled_heartbeat = heartbeat
+                if current is not None:
+                    self.events.append(current)
+                    loop_blocked_total.inc()
+                    logger.warning(
+                        "Event loop blocked for more than %.0f ms, loop thread stack:\n%s",
+                        self.blocking_threshold * 1000,
+                        "".join(current.stack),
+                    )
+
+    def _capture(self) -> Optional[BlockingEvent]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        frames = traceback.extract_stack(frame)
+        return BlockingEvent(
+            started_at=datetime.now(timezone.utc),
+            stack=frames.format(),
+            location=application_location(frames, self.application_roots),
+        )
+
+    def summary(self) -> dict:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "blocking_threshold_ms": self.blocking_threshold * 1000,
+            "lag_p50_ms": loop_lag_seconds.quantile(0.5) * 1000,
+            "lag_p99_ms": loop_lag_seconds.quantile(0.99) * 1000,
+            "samples": loop_lag_seconds.count(),
+            "blocked_total": int(loop_blocked_total.get()),
+            "recent_blocking_events": list(self.events),
+        }
+
+
+loop_monitor = LoopMonitor()
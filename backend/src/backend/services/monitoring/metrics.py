@@ -0,0 +1,151 @@
+import abc
+import math
+import threading
+from typing import Iterable, Optional
+
+LabelValues = tuple[tuple[str, str], ...]
+
+# Seconds, suited to latencies from sub-millisecond to a few seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels: dict[str, str]) -> LabelValues:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: LabelValues, extra: Optional[tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    rendered = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in items)
+    return "{" + rendered + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric(abc.ABC):
+    type = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Sample lines in the exposition format, without HELP and TYPE."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(_labels(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self.values[_labels(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.counts: dict[LabelValues, list[int]] = {}
+        self.sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            counts = self.counts.setdefault(key, [0] * len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        return sum(self.counts.get(_labels(labels), ()))
+
+    def quantile(self, q: float, **labels: str) -> float:
+        """Upper bucket bound below which a fraction ``q`` of observations fall."""
+        counts = self.counts.get(_labels(labels))
+        if not counts:
+            return 0.0
+        target = q * sum(counts)
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return math.inf
+
+    def samples(self) -> Iterable[str]:
+        for labels, counts in sorted(self.counts.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(labels, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(self.sums[labels])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
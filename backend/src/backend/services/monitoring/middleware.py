@@ -0,0 +1,59 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.services.monitoring.query_log import current_request_scope
+from backend.services.monitoring.tracing import SPAN_KIND_SERVER, SpanContext, Tracer, tracer
+from backend.utils import get_route_template
+
+
+class QueryContextMiddleware:
+    """Expose the current request to SQLAlchemy event hooks for route attribution."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request_scope.reset(token)
+
+
+class TracingMiddleware:
+    """Run each HTTP request in a server span, continuing the caller's trace from ``traceparent``."""
+
+    def __init__(self, app: ASGIApp, tracer: Tracer = tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = next((value for name, value in scope["headers"] if name == b"traceparent"), None)
+        parent = SpanContext.from_traceparent(traceparent.decode("latin-1") if traceparent else None)
+        method = scope["method"]
+        attributes = {"http.request.method": method, "url.path": scope["path"]}
+
+        with self.tracer.start_span(method, SPAN_KIND_SERVER, attributes, parent=parent) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_error(f"HTTP {message['status']}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                # Routing fills in the matched route on the way in; unmatched paths keep the bare method
+                if "route" in scope:
+                    route = get_route_template(scope)
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
@@ -0,0 +1,224 @@
+import functools
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.settings import settings
+from backend.utils import get_route_template
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being handled, set by QueryContextMiddleware
+current_request_scope: ContextVar[Optional[dict]] = ContextVar("current_request_scope", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+# SELECTs that take row locks or have side effects, running them again for EXPLAIN ANALYZE is not harmless
+_NOT_ANALYZABLE = re.compile(
+    r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b"
+    r"|\b(?:nextval|setval|pg_(?:try_)?advisory\w*|txid_current|pg_current_xact_id|pg_notify|lo_\w+|dblink\w*)\s*\(",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class QueryStats:
+    fingerprint: str
+    statement: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    slow_calls: int = 0
+    last_slow_at: Optional[datetime] = None
+    last_slow_ms: Optional[float] = None
+    last_parameters: Any = None
+    last_route: Optional[str] = None
+    plan: Optional[list[str]] = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+# SQLAlchemy emits the same few hundred statement strings over and over
+@functools.lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """Replace literals and bind placeholders with ``?`` so similar queries group together."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _IN_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint_statement(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Keep the shape and scalar types of bind parameters, drop any text or binary values."""
+    if isinstance(parameters, dict):
+        return {key: redact_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """Times every statement on an engine and keeps per-fingerprint statistics.
+
+    Statements slower than ``threshold_ms`` are logged with their redacted
+    parameters and the route that issued them, and optionally get their query
+    plan captured (at most once per ``explain_interval_seconds`` per fingerprint).
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = settings.SLOW_QUERY_THRESHOLD_MS,
+        explain: bool = settings.SLOW_QUERY_EXPLAIN,
+        max_fingerprints: int = settings.SLOW_QUERY_MAX_FINGERPRINTS,
+        explain_interval_seconds: float = 300.0,
+    ):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        self.explain_interval_seconds = explain_interval_seconds
+        self.stats: OrderedDict[str, QueryStats] = OrderedDict()
+        self._plan_captured_at: dict[str, float] = {}
+
+    def install(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def snapshot(self, order_by: str = "total_ms", limit: int = 50) -> list[QueryStats]:
+        return sorted(self.stats.values(), key=lambda stats: getattr(stats, order_by), reverse=True)[:limit]
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self._plan_captured_at.clear()
+
+    def _before_cursor_execute(self, conn: Connection, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn: Connection, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+
+        normalized = normalize_statement(statement)
+        fingerprint = fingerprint_statement(normalized)
+        stats = self.stats.get(fingerprint)
+        if stats is None:
+            stats = self.stats[fingerprint] = QueryStats(fingerprint=fingerprint, statement=normalized)
+            while len(self.stats) > self.max_fingerprints:
+                evicted, _ = self.stats.popitem(last=False)
+                self._plan_captured_at.pop(evicted, None)
+        else:
+            self.stats.move_to_end(fingerprint)
+
+        stats.calls += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if elapsed_ms < self.threshold_ms:
+            return
+
+        stats.slow_calls += 1
+        stats.last_slow_at = datetime.now(timezone.utc)
+        stats.last_slow_ms = elapsed_ms
+        stats.last_parameters = redact_parameters(parameters)
+        stats.last_route = _current_route()
+        if self.explain and not executemany and self._plan_due(fingerprint):
+            stats.plan = self._explain(conn, statement, parameters)
+
+        logger.warning(
+            "Slow query %s (%.1f ms) on %s: %s parameters=%s",
+            fingerprint,
+            elapsed_ms,
+            stats.last_route or "<no request>",
+            normalized,
+            stats.last_parameters,
+        )
+
+    def _handle_error(self, context) -> None:
+        # after_cursor_execute is skipped for failed statements, drop their start time
+        if context.connection is not None and context.cursor is not None:
+            start_times = context.connection.info.get("query_start_time")
+            if start_times:
+                start_times.pop()
+
+    def _plan_due(self, fingerprint: str) -> bool:
+        now = time.monotonic()
+        captured_at = self._plan_captured_at.get(fingerprint)
+        if captured_at is not None and now - captured_at < self.explain_interval_seconds:
+            return False
+        self._plan_captured_at[fingerprint] = now
+        return True
+
+    def _explain(self, conn: Connection, statement: str, parameters: Any) -> Optional[list[str]]:
+        prefix = explain_prefix(conn.dialect.name, statement)
+        if prefix is None:
+            return None
+
+        # A failed EXPLAIN must not abort the request's transaction on PostgreSQL
+        use_savepoint = conn.dialect.name == "postgresql" and conn.in_transaction()
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            if use_savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+            if use_savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception:
+            logger.debug("Could not EXPLAIN slow query", exc_info=True)
+            if use_savepoint:
+                try:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                except Exception:
+                    pass
+            return None
+        finally:
+            cursor.close()
+
+        return [" ".join(str(column) for column in row) for row in rows]
+
+
+def explain_prefix(dialect: str, statement: str) -> Optional[str]:
+    """The EXPLAIN variant to capture the plan of ``statement`` with, ``None`` if it should not be explained."""
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    if keyword not in _EXPLAINABLE:
+        return None
+    if dialect == "postgresql":
+        # ANALYZE executes the statement again: only for plain reads, never writes, locks or side effects
+        if keyword == "select" and not _NOT_ANALYZABLE.search(statement):
+            return "EXPLAIN (ANALYZE, BUFFERS) "
+        return "EXPLAIN "
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    return None
+
+
+def _current_route() -> Optional[str]:
+    scope = current_request_scope.get()
+    if scope is None:
+        return None
+    return f"{scope.get('method', '')} {get_route_template(scope)}".strip()
+
+
+slow_query_log = SlowQueryLog()
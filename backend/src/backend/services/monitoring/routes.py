@@ -0,0 +1,35 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.services.auth.utils import current_superuser
+from backend.services.monitoring.loop_monitor import loop_monitor
+from backend.services.monitoring.metrics import registry
+from backend.services.monitoring.query_log import slow_query_log
+from backend.services.monitoring.schemas import LoopMonitorRead, QueryStatsRead
+
+router = APIRouter(prefix="/monitoring", dependencies=[Depends(current_superuser)])
+
+@router.get("/queries", response_model=list[QueryStatsRead])
+async def list_query_stats(
+    order_by: Literal["total_ms", "max_ms", "mean_ms", "calls", "slow_calls"] = "total_ms",
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Statement statistics aggregated by fingerprint, slowest first."""
+    return slow_query_log.snapshot(order_by=order_by, limit=limit)
+
+@router.delete("/queries", status_code=204)
+async def reset_query_stats():
+    slow_query_log.reset()
+
+
+@router.get("/loop", response_model=LoopMonitorRead)
+async def get_loop_monitor():
+    """Event-loop lag percentiles and the stacks of recent blocking callbacks."""
+    return loop_monitor.summary()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Process metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+class QueryStatsRead(BaseModel):
+    fingerprint: str
+    statement: str
+    calls: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    slow_calls: int
+    last_slow_at: Optional[datetime] = None
+    last_slow_ms: Optional[float] = None
+    last_parameters: Any = None
+    last_route: Optional[str] = None
+    plan: Optional[list[str]] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BlockingEventRead(BaseModel):
+    started_at: datetime
+    duration_seconds: Optional[float] = None
+    location: str
+    stack: list[str]
+
+    model_config = {"from_attributes": True}
+
+class LoopMonitorRead(BaseModel):
+    running: bool
+    interval_ms: float
+    blocking_threshold_ms: float
+    lag_p50_ms: float
+    lag_p99_ms: float
+    samples: int
+    blocked_total: int
+    recent_blocking_events: list[BlockingEventRead]
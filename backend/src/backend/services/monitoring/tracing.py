@@ -0,0 +1,372 @@
+import functools
+import json
+import logging
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.services.monitoring.query_log import normalize_statement
+from backend.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# OTLP enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_STATEMENT_TARGET = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE)\s+[\"`]?([\w.]+)", re.IGNORECASE)
+
+
+@dataclass
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @classmethod
+    def from_traceparent(cls, header: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a W3C ``traceparent`` header, ``None`` if it is missing or malformed."""
+        match = _TRACEPARENT.match(header.strip().lower()) if header else None
+        if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+            return None
+        return cls(trace_id=match.group(1), span_id=match.group(2), sampled=bool(int(match.group(3), 16) & 1))
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_span_id: Optional[str]
+    kind: int = SPAN_KIND_INTERNAL
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_time_ns: int = field(default_factory=time.time_ns)
+    end_time_ns: Optional[int] = None
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+    events: list[dict] = field(default_factory=list)
+
+    @property
+    def recording(self) -> bool:
+        return self.context.sampled
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording:
+            self.attributes[key] = value
+
+    def set_error(self, message: str = "") -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        if not self.recording:
+            return
+        self.events.append({
+            "timeUnixNano": str(time.time_ns()),
+            "name": "exception",
+            "attributes": _otlp_attributes({
+                "exception.type": type(exc).__qualname__,
+                "exception.message": str(exc),
+            }),
+        })
+        self.set_error(str(exc))
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns or self.start_time_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, "message": self.status_message},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = self.events
+        return span
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class OTLPJsonExporter:
+    """Append finished spans to a file (or stdout) as OTLP/JSON lines.
+
+    Each line is an ``ExportTraceServiceRequest`` in the JSON encoding, the
+    format of the OpenTelemetry Collector's file exporter, so the output can be
+    replayed into any OTLP backend later or simply read with ``jq``. Spans are
+    handed to a writer thread, so file I/O never runs on the event loop, and
+    written once ``max_batch`` have finished or ``max_delay`` seconds after the
+    first of a batch.
+    """
+
+    def __init__(self, path: str, service_name: str, max_batch: int = 512, max_delay: float = 5.0):
+        self.path = path
+        self.service_name = service_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        # Spans, or an Event to set once everything queued before it is written
+        self._queue: queue.SimpleQueue[Span | threading.Event] = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        if self._writer is None:
+            self._start_writer()
+        self._queue.put(span)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until the spans added so far are written, for shutdown and tests."""
+        if self._writer is None:
+            return
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait(timeout)
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="otlp-json-exporter", daemon=True)
+                self._writer.start()
+
+    def _run(self) -> None:
+        spans: list[Span] = []
+        deadline = 0.0
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0) if spans else None)
+            except queue.Empty:
+                item = None
+            if isinstance(item, Span):
+                if not spans:
+                    deadline = time.monotonic() + self.max_delay
+                spans.append(item)
+                if len(spans) < self.max_batch:
+                    continue
+            if spans:
+                try:
+                    self._write(spans)
+                except Exception:
+                    logger.exception("Could not export %d spans to %s", len(spans), self.path)
+                spans = []
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, spans: list[Span]) -> None:
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        line = json.dumps(request, separators=(",", ":"), default=str) + "\n"
+        if self.path == "-":
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        else:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class Tracer:
+    """Minimal tracer: spans nest through a context variable and sampled ones go to the exporter.
+
+    The sampling decision is made once per trace, at its root, from the trace
+    id; child spans and incoming ``traceparent`` headers carry it along. When
+    tracing is disabled spans are still created, so callers never need to
+    check, but nothing is recorded.
+    """
+
+    def __init__(
+        self,
+        exporter: OTLPJsonExporter,
+        sample_ratio: float = settings.TRACING_SAMPLE_RATIO,
+        enabled: bool = settings.TRACING_ENABLED,
+    ):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.enabled = enabled
+
+    def create_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+    ) -> Span:
+        """Start a span without making it current, for hooks that cannot wrap a block of code."""
+        if parent is None and (current := current_span.get()) is not None:
+            parent = current.context
+        if parent is None:
+            trace_id = secrets.token_hex(16)
+            sampled = self.enabled and self._should_sample(trace_id)
+        else:
+            trace_id = parent.trace_id
+            sampled = self.enabled and parent.sampled
+        return Span(
+            name=name,
+            context=SpanContext(trace_id=trace_id, span_id=secrets.token_hex(8), sampled=sampled),
+            parent_span_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=dict(attributes or {}) if sampled else {},
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_time_ns = time.time_ns()
+        if span.recording:
+            self.exporter.add(span)
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+    ) -> Iterator[Span]:
+        """Run a block inside a new span that is the parent of spans started within it."""
+        span = self.create_span(name, kind, attributes, parent)
+        token = current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            self.end_span(span)
+
+    def traced(self, name: Optional[str] = None, kind: int = SPAN_KIND_INTERNAL):
+        """Decorate an async function so each call runs in its own span."""
+
+        def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+            span_name = name or fn.__qualname__
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs) -> T:
+                with self.start_span(span_name, kind):
+                    return await fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Record a client span for every statement executed inside a sampled trace."""
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def shutdown(self) -> None:
+        self.exporter.flush()
+
+    def _should_sample(self, trace_id: str) -> bool:
+        # Deterministic in the trace id, like OpenTelemetry's TraceIdRatioBased sampler
+        return int(trace_id[16:], 16) < self.sample_ratio * 2**64
+
+    def _before_cursor_execute(self, conn: Connection, cursor, statement, parameters, context, executemany):
+        parent = current_span.get()
+        span = None
+        if parent is not None and parent.recording:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+            target = _STATEMENT_TARGET.search(statement)
+            span = self.create_span(
+                f"{operation} {target.group(1)}" if target else operation,
+                kind=SPAN_KIND_CLIENT,
+                attributes={
+                    "db.system": conn.dialect.name,
+                    "db.operation": operation,
+                    "db.statement": normalize_statement(statement),
+                },
+            )
+            if executemany:
+                span.set_attribute("db.executemany", True)
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    def _after_cursor_execute(self, conn: Connection, cursor, statement, parameters, context, executemany):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            if cursor is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rowcount", cursor.rowcount)
+            self.end_span(span)
+
+    def _handle_error(self, exception_context) -> None:
+        # Errors raised before a cursor exists never went through before_cursor_execute
+        conn = exception_context.connection
+        if conn is None or exception_context.cursor is None:
+            return
+        spans = conn.info.get("trace_spans")
+        if spans:
+            span = spans.pop()
+            if span is not None:
+                span.record_exception(exception_context.original_exception)
+                self.end_span(span)
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that wraps each request in a client span and propagates ``traceparent``."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None, tracer: Optional[Tracer] = None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.tracer = tracer
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        active_tracer = self.tracer or tracer
+        attributes = {
+            "http.request.method": request.method,
+            "server.address": request.url.host,
+            "url.full": str(request.url.copy_with(query=None)),
+        }
+        with active_tracer.start_span(f"{request.method} {request.url.host}", SPAN_KIND_CLIENT, attributes) as span:
+            if active_tracer.enabled:
+                request.headers["traceparent"] = span.context.traceparent()
+            response = await self.transport.handle_async_request(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_error(f"HTTP {response.status_code}")
+            return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict]:
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            encoded.append({"key": key, "value": {"boolValue": value}})
+        elif isinstance(value, int):
+            # int64 is a string in OTLP/JSON
+            encoded.append({"key": key, "value": {"intValue": str(value)}})
+        elif isinstance(value, float):
+            encoded.append({"key": key, "value": {"doubleValue": value}})
+        else:
+            encoded.append({"key": key, "value": {"stringValue": str(value)}})
+    return encoded
+
+
+tracer = Tracer(OTLPJsonExporter(settings.TRACING_EXPORT_PATH, settings.TRACING_SERVICE_NAME))
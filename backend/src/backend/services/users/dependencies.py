@@ -1,16 +1,20 @@
 from fastapi import Depends
 
-from backend.services.users.service import UserManager
+from backend.services.users.service import CoalescingUserDatabase, UserManager, password_helper
 from fastapi_users.db import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.db import get_async_session
 from backend.services.users.models import User
+from backend.settings import settings
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
-    yield SQLAlchemyUserDatabase(session, User) 
+    if settings.USER_LOOKUP_COALESCING:
+        yield CoalescingUserDatabase(session, User)
+    else:
+        yield SQLAlchemyUserDatabase(session, User)
 
 async def get_user_manager(user_db=Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 
@@ -1,20 +1,86 @@
+import asyncio
 import uuid
 from typing import Optional
 from fastapi import Request, Response
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions
+from fastapi_users.db import SQLAlchemyUserDatabase
 
+from backend.db import async_session_maker
+from backend.services.auth.hashing import build_password_helper
+from backend.services.monitoring.metrics import registry
+from backend.services.monitoring.tracing import tracer
 from backend.services.users.models import User
 from backend.settings import settings
 from backend.services.email.service import email_service
+from backend.single_flight import SingleFlight
+
+# Shared by every UserManager instead of building a hashing context per request
+password_helper = build_password_helper()
+
+password_rehashes_total = registry.counter(
+    "password_rehashes_total",
+    "Stored password hashes upgraded to the configured algorithm and parameters on login",
+)
+
+user_lookups = SingleFlight("user_lookup", timeout=settings.SINGLE_FLIGHT_TIMEOUT_SECONDS)
+
+class CoalescingUserDatabase(SQLAlchemyUserDatabase[User, uuid.UUID]):
+    """User database whose lookups by id share one query between concurrent requests."""
+
+    async def get(self, id: uuid.UUID) -> Optional[User]:
+        # A user this session already holds may have pending changes, never replace it with the shared copy
+        if (user := self._in_session(id)) is not None:
+            return user
+        user = await user_lookups.do(id, lambda: _load_user(id))
+        if user is None:
+            return None
+        # The session may have loaded it while we waited
+        if (existing := self._in_session(id)) is not None:
+            return existing
+        # The shared instance is detached, give each request its own copy without a query
+        return await self.session.merge(user, load=False)
+
+    def _in_session(self, id: uuid.UUID) -> Optional[User]:
+        return self.session.identity_map.get(self.session.identity_key(User, id))
+
+async def _load_user(id: uuid.UUID) -> Optional[User]:
+    # Own session so the result does not depend on the lifetime of the first caller's session
+    async with async_session_maker() as session:
+        user = await session.get(User, id)
+        if user is not None:
+            session.expunge(user)
+        return user
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        # Same as fastapi-users, but hashing runs in a thread instead of blocking the event loop
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await asyncio.to_thread(self.password_helper.hash, credentials.password)
+            return None
+
+        verified, updated_password_hash = await asyncio.to_thread(
+            self.password_helper.verify_and_update, credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            # Stored hash uses another algorithm or older parameters, upgrade it while we have the password
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+            password_rehashes_total.inc()
+        return user
+
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         print(f"User {user.id} has registered.")
         # Request verification token generation and send email
-        await self.request_verify(user, request)
+        with tracer.start_span("users.request_verify"):
+            await self.request_verify(user, request)
 
     async def on_after_request_verify(self, user: User, token: str, request: Optional[Request] = None):
         print(f"Verification requested for user {user.id}. Verification token: {token}")
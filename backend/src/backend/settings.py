@@ -35,6 +35,10 @@ class Settings(BaseSettings):
     # Frontend Configuration
     FRONTEND_HOST: str = "localhost"
     FRONTEND_PORT: str = "5173"
+
+    # Serve the built frontend (`npm run build` output) from the backend
+    SERVE_FRONTEND: bool = False
+    FRONTEND_DIST_DIR: str = str(backend_root.parent / "frontend" / "dist")
     
     # Domain Configuration (for production)
     # When ENVIRONMENT=prod, these override the HOST:PORT pattern
@@ -82,6 +86,79 @@ class Settings(BaseSettings):
     # Verification settings
     VERIFICATION_TOKEN_EXPIRE_HOURS: int = 24
 
+    # Password hashing, `backend calibrate-hashing` recommends values for this hardware.
+    # New hashes use PASSWORD_HASH_ALGORITHM; hashes with other parameters are upgraded on login.
+    PASSWORD_HASH_ALGORITHM: str = "argon2"  # "argon2" or "bcrypt"
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST_KIB: int = 64 * 1024
+    ARGON2_PARALLELISM: int = 4
+    BCRYPT_ROUNDS: int = 12
+
+    # Migrations (see backend.online_migrations)
+    MIGRATION_LOCK_TIMEOUT_MS: int = 5000  # 0 disables, PostgreSQL only
+    MIGRATION_STATEMENT_TIMEOUT_MS: int = 0  # 0 disables, PostgreSQL only
+    MIGRATION_REPORT_PATH: str = ""  # Write a JSON timing report here when set
+
+    # Slow query log (see /api/monitoring/queries)
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN: bool = False  # Capture EXPLAIN (ANALYZE for PostgreSQL SELECTs) of slow queries
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+
+    # Event-loop lag monitor (see /api/monitoring/loop)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_MS: float = 100.0
+    LOOP_BLOCKING_THRESHOLD_MS: float = 100.0  # Capture the stack of callbacks blocking longer
+
+    # Single-flight coalescing of concurrent identical reads
+    USER_LOOKUP_COALESCING: bool = True
+    SINGLE_FLIGHT_TIMEOUT_SECONDS: float = 5.0
+
+    # Admission control / load shedding (priority classes: critical, high, normal, low)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 64  # Requests processed at once per worker
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_TARGET_DELAY_MS: float = 5.0  # CoDel target queueing delay
+    ADMISSION_INTERVAL_MS: float = 100.0  # CoDel interval
+    ADMISSION_DEFAULT_PRIORITY: str = "normal"
+    # "[METHOD ]/path-prefix" -> priority class, longest prefix wins (JSON when set from the environment)
+    ADMISSION_ROUTE_PRIORITIES: dict[str, str] = {
+        "/api/monitoring": "critical",
+        "/api/health": "critical",
+        "GET /api/users/me": "high",
+        "/api/auth/jwt": "high",
+        "/api/auth/register": "low",
+        "/api/auth/forgot-password": "low",
+        "/api/auth/request-verify-token": "low",
+    }
+
+    # Request tracing, written as OTLP/JSON lines so no collector is needed
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATIO: float = 1.0  # Fraction of new traces recorded, incoming traceparent flags are honored
+    TRACING_EXPORT_PATH: str = "-"  # File to append to, "-" for stdout
+    TRACING_SERVICE_NAME: str = "backend"
+
+    # Warm-up before the worker reports ready
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 5  # Pool connections opened and primed at startup, capped at the pool size
+
+    # Bulk announcement emails
+    ANNOUNCEMENT_BATCH_SIZE: int = 100  # Recipients per checkpoint, Resend accepts at most 100 per batch call
+    ANNOUNCEMENT_SMTP_POOL_SIZE: int = 4  # Concurrent SMTP connections
+    ANNOUNCEMENT_SMTP_RATE_PER_SECOND: float = 10.0  # Messages per second over SMTP
+    ANNOUNCEMENT_RESEND_REQUESTS_PER_SECOND: float = 2.0  # Resend's default API rate limit
+    ANNOUNCEMENT_LEASE_SECONDS: int = 300  # A sender that stops checkpointing this long is presumed dead
+    ANNOUNCEMENT_RESUME_ON_STARTUP: bool = True
+
+    # Idempotency-Key support for POST endpoints
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 1024  # Responses kept in the in-memory front cache
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: float = 30.0  # Max wait for an in-flight duplicate
+    # Path prefixes never stored, their responses carry credentials (JSON when set from the environment)
+    IDEMPOTENCY_EXCLUDED_PATHS: list[str] = ["/api/auth/jwt"]
+
     # For pydantic v2, use SettingsConfigDict instead of Config class
     model_config = SettingsConfigDict(
         env_prefix="",
@@ -0,0 +1,73 @@
+import asyncio
+import functools
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Optional, TypeVar
+
+from backend.services.monitoring.metrics import registry
+
+T = TypeVar("T")
+
+single_flight_calls_total = registry.counter(
+    "single_flight_calls_total",
+    "Calls through a single-flight group, by whether they ran the work or shared it",
+)
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is in flight await the same task and get the same result
+    or exception. Nothing is cached: once the task finishes the next call for
+    the key runs the work again. Because the work runs in a separate task, a
+    cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self, name: str, timeout: Optional[float] = None):
+        self.name = name
+        self.timeout = timeout
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            single_flight_calls_total.inc(group=self.name, role="leader")
+            task = asyncio.create_task(self._run(fn, timeout if timeout is not None else self.timeout))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            single_flight_calls_total.inc(group=self.name, role="shared")
+        return await asyncio.shield(task)
+
+    @staticmethod
+    async def _run(fn: Callable[[], Awaitable[T]], timeout: Optional[float]) -> T:
+        if timeout is None:
+            return await fn()
+        return await asyncio.wait_for(fn(), timeout)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so an unawaited failure does not get logged as "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+def single_flight(group: SingleFlight, key: Callable[..., Hashable]):
+    """Decorate an async function (or FastAPI dependency) so concurrent identical calls share one run.
+
+    ``key`` receives the same arguments as the function and returns the
+    coalescing key, e.g. ``key=lambda user_id: user_id``.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs) -> T:
+            return await group.do(key(*args, **kwargs), lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
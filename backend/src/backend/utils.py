@@ -1,6 +1,26 @@
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+
+def get_route_template(scope: Dict[str, Any]) -> Optional[str]:
+    """Return the matched route of a request as a template, e.g. ``/api/users/{id}``.
+
+    Routes of included routers only know their own path, so the router prefixes
+    are recovered from the concrete request path.
+    """
+    route = scope.get("route")
+    path = scope.get("path")
+    if route is None or path is None:
+        return path
+    path_format = getattr(route, "path_format", None) or getattr(route, "path", "")
+    try:
+        rendered = path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return path_format
+    if rendered and path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + path_format
+    return path_format
 
 
 def format_method_color(method: str) -> str:
@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+import pytest_asyncio
+
+# Settings are read at import time, so provide the required values before any
+# backend module is imported by the tests.
+_test_dir = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ.setdefault("SQLITE_DB_PATH", os.path.join(_test_dir, "test.db"))
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "admin123")
+os.environ.setdefault("ADMIN_FIRST_NAME", "Admin")
+os.environ.setdefault("ADMIN_LAST_NAME", "User")
+os.environ.setdefault("MAIL_FROM", "test@example.com")
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine(tmp_path):
+    """Create a file-backed SQLite engine with ``tables`` created, all of ``Base``'s when none are given.
+
+    Call it as ``await sqlite_engine(User.__table__, ...)``. Every engine made
+    in a test is disposed when the test ends.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from backend.db import Base
+
+    engines = []
+
+    async def create(*tables):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / f'test-{len(engines)}.db'}")
+        engines.append(engine)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=list(tables) or None)
+        return engine
+
+    yield create
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_session_maker(sqlite_engine):
+    """Like ``sqlite_engine``, but returns a session maker bound to the new engine."""
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async def create(*tables):
+        return async_sessionmaker(await sqlite_engine(*tables), expire_on_commit=False)
+
+    return create
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from backend.services.admission.middleware import AdmissionControlMiddleware
+from backend.services.admission.service import AdmissionController, Rejected, RoutePriorities
+
+
+def test_route_priorities_use_longest_matching_rule():
+    priorities = RoutePriorities(
+        {"/api": "normal", "GET /api/users/me": "high", "/api/auth/register": "low"},
+        default="low",
+    )
+
+    assert priorities.classify("GET", "/api/users/me") == "high"
+    assert priorities.classify("PATCH", "/api/users/me") == "normal"
+    assert priorities.classify("POST", "/api/auth/register") == "low"
+    assert priorities.classify("GET", "/api/users/me-not") == "normal"
+    assert priorities.classify("GET", "/") == "low"
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_waiters_are_admitted_first():
+    controller = AdmissionController(max_concurrency=1, max_queue=10, queue_timeout=1, target_delay=1, interval=1)
+    await controller.acquire("normal")
+
+    order = []
+
+    async def request(priority):
+        await controller.acquire(priority)
+        order.append(priority)
+        controller.release()
+
+    waiters = [asyncio.create_task(request(p)) for p in ("low", "normal", "high")]
+    await asyncio.sleep(0)
+    controller.release()
+    await asyncio.gather(*waiters)
+
+    assert order == ["high", "normal", "low"]
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_evicts_lowest_priority_waiter():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=1, target_delay=1, interval=1)
+    await controller.acquire("normal")
+
+    low = asyncio.create_task(controller.acquire("low"))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(controller.acquire("high"))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Rejected):
+        await low
+    controller.release()
+    await high
+    assert controller.in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_standing_queue_sheds_low_priority_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, max_queue=100, queue_timeout=5, target_delay=0.001, interval=0.01)
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work():
+        await asyncio.sleep(0.01)
+        return {}
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=controller,
+        priorities=RoutePriorities({"/health": "critical"}, default="low"),
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/work") for _ in range(30)))
+        statuses = [r.status_code for r in responses]
+
+        assert 200 in statuses and 503 in statuses
+        shed = next(r for r in responses if r.status_code == 503)
+        assert int(shed.headers["retry-after"]) >= 1
+        assert (await client.get("/health")).status_code == 200
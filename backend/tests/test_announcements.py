@@ -0,0 +1,149 @@
+import asyncio
+
+import aiosmtplib
+import pytest
+import pytest_asyncio
+from fastapi_mail import ConnectionConfig
+from sqlalchemy import insert
+
+from backend.services.announcements.models import Announcement
+from backend.services.announcements.service import AnnouncementSender
+from backend.services.email.bulk import BulkDeliveryError, OutgoingEmail, SMTPPoolTransport
+from backend.services.users.models import User
+
+
+class RecordingTransport:
+    def __init__(self, fail_on_batch=None):
+        self.fail_on_batch = fail_on_batch
+        self.batches = []
+        self.closed = False
+
+    async def send_batch(self, messages, idempotency_key):
+        if len(self.batches) == self.fail_on_batch:
+            raise BulkDeliveryError("provider is down")
+        self.batches.append([message.to for message in messages])
+        return [None] * len(messages)
+
+    async def close(self):
+        self.closed = True
+
+    @property
+    def recipients(self):
+        return [to for batch in self.batches for to in batch]
+
+
+@pytest_asyncio.fixture
+async def session_maker(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(User.__table__, Announcement.__table__)
+    async with session_maker.begin() as session:
+        await session.execute(
+            insert(User),
+            [
+                {
+                    "email": f"user{i}@example.com",
+                    "hashed_password": "x",
+                    "is_active": i != 3,
+                    "is_superuser": False,
+                    "is_verified": i % 5 != 0,
+                }
+                for i in range(25)
+            ],
+        )
+    return session_maker
+
+
+def expected_recipients():
+    return {f"user{i}@example.com" for i in range(25) if i != 3 and i % 5 != 0}
+
+
+@pytest.mark.asyncio
+async def test_sends_once_to_every_verified_active_user(session_maker):
+    transport = RecordingTransport()
+    sender = AnnouncementSender(session_maker, transport_factory=lambda: transport, batch_size=4)
+    announcement = await sender.create("News", "First paragraph.\n\nSecond paragraph.")
+
+    finished = await sender.run(announcement.id)
+
+    assert sorted(transport.recipients) == sorted(expected_recipients())
+    assert all(len(batch) <= 4 for batch in transport.batches)
+    assert transport.closed
+    assert finished.status == "completed"
+    assert finished.sent_count == len(expected_recipients())
+    assert await sender.run(announcement.id) is None
+
+
+@pytest.mark.asyncio
+async def test_resumes_after_the_last_checkpoint(session_maker):
+    failing = RecordingTransport(fail_on_batch=2)
+    sender = AnnouncementSender(session_maker, transport_factory=lambda: failing, batch_size=4)
+    announcement = await sender.create("News", "Body")
+
+    with pytest.raises(BulkDeliveryError):
+        await sender.run(announcement.id)
+
+    interrupted = await sender.get(announcement.id)
+    assert interrupted.status == "sending"
+    assert interrupted.sent_count == 8
+    assert interrupted.last_error == "provider is down"
+
+    retry = RecordingTransport()
+    sender.transport_factory = lambda: retry
+    finished = await sender.run(announcement.id)
+
+    assert set(failing.recipients).isdisjoint(retry.recipients)
+    assert sorted(failing.recipients + retry.recipients) == sorted(expected_recipients())
+    assert finished.status == "completed"
+    assert finished.last_error is None
+
+
+@pytest.mark.asyncio
+async def test_a_held_lease_keeps_other_senders_out(session_maker):
+    sender = AnnouncementSender(session_maker, transport_factory=RecordingTransport, batch_size=4)
+    announcement = await sender.create("News", "Body")
+
+    assert await sender._claim(announcement.id, owner="someone-else") is not None
+    assert await sender.run(announcement.id) is None
+    assert await sender.resume_pending() == []
+
+
+@pytest.mark.asyncio
+async def test_completion_is_skipped_once_the_lease_is_lost(session_maker):
+    sender = AnnouncementSender(session_maker, transport_factory=RecordingTransport, batch_size=4)
+    announcement = await sender.create("News", "Body")
+    await sender._claim(announcement.id, owner="someone-else")
+
+    assert await sender._finish(announcement.id, owner="expired-run") is None
+    assert (await sender.get(announcement.id)).status == "sending"
+
+
+class FlakyConnection:
+    async def send_message(self, message):
+        # Long enough for the other sends to queue up for the pool's only connection
+        await asyncio.sleep(0.05)
+        raise aiosmtplib.SMTPServerDisconnected("connection lost")
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_failure_cancels_the_other_sends(monkeypatch):
+    config = ConnectionConfig(
+        MAIL_USERNAME="", MAIL_PASSWORD="", MAIL_FROM="news@example.com", MAIL_PORT=25, MAIL_SERVER="localhost",
+        MAIL_STARTTLS=False, MAIL_SSL_TLS=False, USE_CREDENTIALS=False,
+    )
+    transport = SMTPPoolTransport(config, pool_size=1, rate_per_second=1000)
+    connects = []
+
+    async def connect():
+        connects.append(1)
+        if len(connects) > 1:
+            raise OSError("connection refused")
+        return FlakyConnection()
+
+    monkeypatch.setattr(transport, "_connect", connect)
+    messages = [OutgoingEmail(to=f"user{i}@example.com", subject="News", html="<p>Hi</p>") for i in range(5)]
+
+    with pytest.raises(BulkDeliveryError, match="Could not connect"):
+        await transport.send_batch(messages, "key")
+
+    # The sends queued for the only connection were cancelled instead of waiting forever
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+    await transport.close()
@@ -0,0 +1,50 @@
+import uuid
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.column_types import CompactUUID
+from backend.db import Base, check_user_id_storage
+from backend.services.users.models import User
+
+table = sa.Table("things", sa.MetaData(), sa.Column("id", CompactUUID, primary_key=True))
+
+
+def test_storage_type_per_dialect():
+    assert "id BLOB NOT NULL" in str(sa.schema.CreateTable(table).compile(dialect=sqlite.dialect()))
+    assert "id UUID NOT NULL" in str(sa.schema.CreateTable(table).compile(dialect=postgresql.dialect()))
+
+
+@pytest.mark.asyncio
+async def test_round_trip_and_ordering_on_sqlite():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    ids = [uuid.uuid4() for _ in range(50)]
+    async with engine.begin() as conn:
+        await conn.run_sync(table.metadata.create_all)
+        await conn.execute(sa.insert(table), [{"id": ids[0]}] + [{"id": str(value)} for value in ids[1:]])
+
+        stored = (await conn.execute(sa.text("SELECT DISTINCT typeof(id), length(id) FROM things"))).all()
+        ordered = (await conn.execute(sa.select(table.c.id).order_by(table.c.id))).scalars().all()
+        after = (await conn.execute(sa.select(table.c.id).where(table.c.id > sorted(ids)[24]))).scalars().all()
+    await engine.dispose()
+
+    assert stored == [("blob", 16)]
+    # Byte order is the order of the string form, keyset pagination over ids keeps working
+    assert ordered == sorted(ids, key=str)
+    assert sorted(after) == sorted(ids)[25:]
+
+
+def test_startup_refuses_user_table_with_string_ids():
+    engine = sa.create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE "user" (id CHAR(36) NOT NULL PRIMARY KEY, email VARCHAR(320))')
+        with pytest.raises(RuntimeError, match="backend upgrade-db"):
+            check_user_id_storage(conn)
+
+        conn.exec_driver_sql('DROP TABLE "user"')
+        # Nothing to check before the table exists
+        check_user_id_storage(conn)
+        Base.metadata.create_all(conn, tables=[User.__table__])
+        check_user_id_storage(conn)
@@ -0,0 +1,98 @@
+import uuid
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from fastapi_users.db import SQLAlchemyBaseUserTableUUID
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import DeclarativeBase
+
+from backend import db
+from backend.db_upgrade import MIGRATIONS_PATH, upgrade_database
+from backend.services.announcements.models import Announcement
+from backend.services.idempotency.models import IdempotencyRecord
+from backend.settings import settings
+
+
+class BaselineBase(DeclarativeBase):
+    pass
+
+
+class BaselineUser(SQLAlchemyBaseUserTableUUID, BaselineBase):
+    """The user model as it was before ids were stored compactly."""
+
+    __tablename__ = "user"
+
+    created_at = sa.Column(sa.DateTime)
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = tmp_path / "upgrade.db"
+    monkeypatch.setattr(settings, "SQLITE_DB_PATH", str(path))
+    engine = sa.create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+
+def add_users(engine, count: int) -> list[uuid.UUID]:
+    ids = [uuid.uuid4() for _ in range(count)]
+    with engine.begin() as conn:
+        conn.execute(
+            sa.insert(BaselineUser.__table__),
+            [
+                {"id": value, "email": f"user{i}@example.com", "hashed_password": "x", "created_at": datetime(2025, 1, 1)}
+                for i, value in enumerate(ids)
+            ],
+        )
+    return ids
+
+
+def migrate_to(revision: str) -> None:
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_PATH))
+    command.upgrade(config, revision)
+
+
+def create_all_from_baseline(engine) -> None:
+    # What the app's own startup did before any migration existed
+    BaselineBase.metadata.create_all(engine)
+
+
+def migrated_to_first_revision_then_started(engine) -> None:
+    # Migrated with Alembic once, later startups created the newer tables
+    migrate_to("333614ead8ed")
+    db.Base.metadata.create_all(engine, tables=[IdempotencyRecord.__table__, Announcement.__table__])
+
+
+@pytest.mark.parametrize("make_database", [create_all_from_baseline, migrated_to_first_revision_then_started])
+def test_upgrade_db_converts_databases_made_by_earlier_versions(database, make_database):
+    make_database(database)
+    ids = add_users(database, 20)
+
+    upgrade_database()
+
+    with database.connect() as conn:
+        assert conn.exec_driver_sql("SELECT version_num FROM alembic_version").scalar_one() == "c51d0e6f8a27"
+        assert conn.exec_driver_sql('SELECT DISTINCT typeof(id), length(id) FROM "user"').all() == [("blob", 16)]
+        assert {"idempotency_key", "announcement"} <= set(sa.inspect(conn).get_table_names())
+        db.check_user_id_storage(conn)
+        user = db.Base.metadata.tables["user"]
+        assert sorted(conn.execute(sa.select(user.c.id)).scalars()) == sorted(ids)
+    # Running it again is a no-op
+    upgrade_database()
+
+
+@pytest.mark.asyncio
+async def test_refused_startup_leaves_the_schema_alone(database, monkeypatch):
+    create_all_from_baseline(database)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{settings.SQLITE_DB_PATH}")
+    monkeypatch.setattr(db, "engine", engine)
+
+    with pytest.raises(RuntimeError, match="backend upgrade-db"):
+        await db.create_db_and_tables()
+    await engine.dispose()
+
+    assert sa.inspect(database).get_table_names() == ["user"]
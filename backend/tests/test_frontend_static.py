@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.frontend import IMMUTABLE_CACHE_CONTROL, FrontendStaticFiles
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>app</html>")
+    (tmp_path / "assets" / "index-3f9a1c2B.js").write_text("console.log('app')")
+    (tmp_path / "assets" / "index-3f9a1c2B.js.gz").write_bytes(gzip.compress(b"console.log('app')"))
+
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.mount("/", FrontendStaticFiles(tmp_path), name="frontend")
+    return TestClient(app)
+
+
+def test_hashed_assets_are_immutable_and_precompressed(client):
+    response = client.get("/assets/index-3f9a1c2B.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "console.log('app')"
+
+
+def test_uncompressed_variant_when_encoding_not_accepted(client):
+    response = client.get("/assets/index-3f9a1c2B.js", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "console.log('app')"
+
+
+def test_etag_revalidation(client):
+    etag = client.get("/index.html").headers["etag"]
+    response = client.get("/index.html", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_spa_fallback_serves_index_but_not_for_api_or_assets(client):
+    assert client.get("/").text == "<html>app</html>"
+    assert client.get("/verify-email/some-token").text == "<html>app</html>"
+    assert client.get("/verify-email/some-token").headers["cache-control"] == "no-cache"
+    assert client.get("/api/ping").json() == {"ok": True}
+    assert client.get("/api/missing").status_code == 404
+    assert client.get("/assets/missing-12345678.js").status_code == 404
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from fastapi_users.db import SQLAlchemyUserDatabase
+from pwdlib.hashers.bcrypt import BcryptHasher
+
+from backend.services.auth.hashing import build_password_helper
+from backend.services.users.models import User
+from backend.services.users.service import UserManager, password_rehashes_total
+from backend.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ALGORITHM", "argon2")
+    monkeypatch.setattr(settings, "ARGON2_TIME_COST", 1)
+    monkeypatch.setattr(settings, "ARGON2_MEMORY_COST_KIB", 1024)
+    monkeypatch.setattr(settings, "ARGON2_PARALLELISM", 1)
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+
+
+@pytest_asyncio.fixture
+async def user_db(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(User.__table__)
+    async with session_maker() as session:
+        yield SQLAlchemyUserDatabase(session, User)
+
+
+def login(email, password):
+    return SimpleNamespace(username=email, password=password)
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_hash_made_with_other_parameters(user_db):
+    await user_db.create({"email": "a@example.com", "hashed_password": BcryptHasher(rounds=4).hash("secret")})
+    manager = UserManager(user_db, build_password_helper())
+    rehashes = password_rehashes_total.get()
+
+    assert await manager.authenticate(login("a@example.com", "wrong")) is None
+    assert (await user_db.get_by_email("a@example.com")).hashed_password.startswith("$2b$")
+
+    user = await manager.authenticate(login("a@example.com", "secret"))
+    assert user.hashed_password.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+    assert password_rehashes_total.get() == rehashes + 1
+
+    # Already at the configured parameters: verified without another rehash
+    assert await manager.authenticate(login("a@example.com", "secret")) is not None
+    assert password_rehashes_total.get() == rehashes + 1
+
+
+@pytest.mark.asyncio
+async def test_raising_a_cost_parameter_triggers_a_rehash(user_db, monkeypatch):
+    manager = UserManager(user_db, build_password_helper())
+    await user_db.create({"email": "b@example.com", "hashed_password": manager.password_helper.hash("secret")})
+
+    monkeypatch.setattr(settings, "ARGON2_TIME_COST", 2)
+    user = await UserManager(user_db, build_password_helper()).authenticate(login("b@example.com", "secret"))
+
+    assert ",t=2," in user.hashed_password
@@ -0,0 +1,48 @@
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from backend.services.health import routes
+from backend.services.health.service import WarmUp
+from backend.services.users.models import User
+
+
+@pytest_asyncio.fixture
+async def engine(sqlite_engine):
+    return await sqlite_engine(User.__table__)
+
+
+@pytest.mark.asyncio
+async def test_warm_up_opens_pool_connections_and_runs_every_step(engine):
+    warm_up = WarmUp(engine, connections=3)
+    await warm_up.run(FastAPI())
+
+    assert [step.name for step in warm_up.steps] == [
+        "database_connections",
+        "email_templates",
+        "password_hash",
+        "openapi_schema",
+    ]
+    assert all(step.error is None for step in warm_up.steps)
+    assert engine.pool.checkedin() == 3
+    assert await warm_up.is_ready()
+
+
+@pytest.mark.asyncio
+async def test_readiness_flips_only_after_warm_up(engine, monkeypatch):
+    warm_up = WarmUp(engine, connections=1)
+    monkeypatch.setattr(routes, "warm_up", warm_up)
+    app = FastAPI()
+    app.include_router(routes.router)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/health/live")).status_code == 200
+        assert (await client.get("/health/ready")).status_code == 503
+
+        await warm_up.run(app)
+        response = await client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert len(response.json()["warm_up"]) == 4
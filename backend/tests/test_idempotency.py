@@ -0,0 +1,182 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, Request
+from sqlalchemy import func, select
+
+from backend.db import get_async_session
+from backend.services.auth.routes import router as auth_router
+from backend.services.idempotency.middleware import IdempotencyMiddleware
+from backend.services.idempotency.models import IdempotencyRecord
+from backend.services.idempotency.service import IdempotencyStore, StoredResponse
+from backend.services.users.models import User
+from backend.services.users.service import password_helper
+from backend.settings import settings
+
+
+@pytest_asyncio.fixture
+async def client(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(IdempotencyRecord.__table__)
+
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/items")
+    async def create_item(request: Request):
+        app.state.calls += 1
+        await asyncio.sleep(0.05)
+        return {"call": app.state.calls, "body": await request.json()}
+
+    store = IdempotencyStore(session_maker=session_maker)
+    app.add_middleware(IdempotencyMiddleware, store=store)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client.app = app
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_retry_replays_stored_response(client):
+    headers = {"Idempotency-Key": "abc"}
+    first = await client.post("/items", json={"name": "a"}, headers=headers)
+    second = await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert first.json() == second.json() == {"call": 1, "body": {"name": "a"}}
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert client.app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_first_result(client):
+    headers = {"Idempotency-Key": "concurrent"}
+    responses = await asyncio.gather(
+        *(client.post("/items", json={"name": "a"}, headers=headers) for _ in range(5))
+    )
+
+    assert {r.json()["call"] for r in responses} == {1}
+    assert client.app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_key_reuse_with_different_body_is_rejected(client):
+    headers = {"Idempotency-Key": "reused"}
+    await client.post("/items", json={"name": "a"}, headers=headers)
+    response = await client.post("/items", json={"name": "b"}, headers=headers)
+
+    assert response.status_code == 422
+    assert client.app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_without_key_are_not_deduplicated(client):
+    await client.post("/items", json={"name": "a"})
+    await client.post("/items", json={"name": "a"})
+
+    assert client.app.state.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_query_string_is_part_of_the_key(client):
+    headers = {"Idempotency-Key": "query"}
+    first = await client.post("/items?list=a", json={"name": "a"}, headers=headers)
+    second = await client.post("/items?list=b", json={"name": "a"}, headers=headers)
+
+    assert [first.json()["call"], second.json()["call"]] == [1, 2]
+    assert "idempotent-replayed" not in second.headers
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_keeps_its_key_from_other_workers(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(IdempotencyRecord.__table__)
+    # Two workers sharing the database, the handler outlives the placeholder's initial expiry
+    first_worker = IdempotencyStore(session_maker=session_maker, lock_timeout_seconds=0.15)
+    second_worker = IdempotencyStore(session_maker=session_maker, lock_timeout_seconds=2)
+    calls = 0
+
+    async def handler():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.5)
+        return StoredResponse(request_hash="", status_code=201, body=b"created")
+
+    async def retry_later():
+        await asyncio.sleep(0.3)
+        return await second_worker.execute("key", "hash", handler)
+
+    (first, first_replayed), (second, second_replayed) = await asyncio.gather(
+        first_worker.execute("key", "hash", handler), retry_later()
+    )
+
+    assert calls == 1
+    assert (first_replayed, second_replayed) == (False, True)
+    assert second.body == b"created"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_while_reading_the_body_aborts_the_request():
+    called = False
+
+    async def app(scope, receive, send):
+        nonlocal called
+        called = True
+
+    messages = [
+        {"type": "http.request", "body": b'{"name":', "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/items",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", b"abc")],
+    }
+    await IdempotencyMiddleware(app, store=IdempotencyStore())(scope, receive, send)
+
+    assert not called
+    assert sent == []
+
+
+@pytest.mark.asyncio
+async def test_login_tokens_are_never_stored(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(User.__table__, IdempotencyRecord.__table__)
+    async with session_maker() as session:
+        session.add(User(email="me@example.com", hashed_password=password_helper.hash("secret"), is_active=True))
+        await session.commit()
+
+    async def get_session():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth_router, prefix="/api")
+    app.dependency_overrides[get_async_session] = get_session
+    store = IdempotencyStore(session_maker=session_maker)
+    app.add_middleware(IdempotencyMiddleware, store=store, excluded_paths=settings.IDEMPOTENCY_EXCLUDED_PATHS)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/auth/jwt/login",
+            data={"username": "me@example.com", "password": "secret"},
+            headers={"Idempotency-Key": "login"},
+        )
+    async with session_maker() as session:
+        stored = await session.scalar(select(func.count()).select_from(IdempotencyRecord))
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+    assert stored == 0
+    assert not store._cache
@@ -0,0 +1,81 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from backend.services.monitoring.loop_monitor import LoopMonitor
+from backend.services.monitoring.metrics import Metric, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("request_seconds", "Request latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/x")
+
+    rendered = registry.render()
+    assert 'request_seconds_bucket{route="/x",le="0.1"} 1' in rendered
+    assert 'request_seconds_bucket{route="/x",le="1"} 2' in rendered
+    assert 'request_seconds_bucket{route="/x",le="+Inf"} 3' in rendered
+    assert 'request_seconds_count{route="/x"} 3' in rendered
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors").inc(path='C:\\tmp\n"quoted"')
+
+    assert 'errors_total{path="C:\\\\tmp\\n\\"quoted\\""} 1' in registry.render()
+
+
+def test_metric_subclasses_must_define_samples():
+    class Incomplete(Metric):
+        type = "untyped"
+
+    with pytest.raises(TypeError, match="samples"):
+        Incomplete("incomplete", "No samples")
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def blocking_library_call():
+    # Blocks inside a stdlib Python frame rather than in C
+    threading.Event().wait(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_callback_stack_is_captured():
+    monitor = LoopMonitor(interval=0.02, blocking_threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        blocking_call()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert len(monitor.events) == 1
+    event = monitor.events[0]
+    assert "blocking_call" in event.location
+    assert event.duration_seconds >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_location_skips_library_frames():
+    monitor = LoopMonitor(interval=0.02, blocking_threshold=0.1, application_roots=[os.path.dirname(__file__)])
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+        blocking_library_call()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert len(monitor.events) == 1
+    event = monitor.events[0]
+    assert "threading.py" in event.stack[-1]
+    assert event.location.endswith("in blocking_library_call")
+    assert event.started_at.tzinfo is not None
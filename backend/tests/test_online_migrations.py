@@ -0,0 +1,229 @@
+import io
+import sqlite3
+import uuid
+
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from backend import online_migrations as online
+from backend.column_types import CompactUUID
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "migration.db"
+    engine = sa.create_engine(f"sqlite:///{path}")
+    with engine.connect() as connection, Operations.context(MigrationContext.configure(connection)):
+        yield path, connection
+    engine.dispose()
+
+
+def things_table(id_type) -> sa.Table:
+    return sa.Table(
+        "things",
+        sa.MetaData(),
+        sa.Column("id", id_type, primary_key=True),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("size", sa.Integer, nullable=False),
+        sa.Index("ix_things_name", "name", unique=True),
+        sa.CheckConstraint("size >= 0", name="ck_things_size"),
+    )
+
+
+def create_things(connection, count: int) -> list[uuid.UUID]:
+    table = things_table(sa.Uuid())
+    table.create(connection)
+    ids = sorted(uuid.uuid4() for _ in range(count))
+    connection.execute(sa.insert(table), [{"id": value, "name": f"thing {i}", "size": i} for i, value in enumerate(ids)])
+    connection.commit()
+    return ids
+
+
+def schema_objects(connection) -> set[str]:
+    return set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").scalars())
+
+
+def test_rebuild_table_converts_rows_and_recreates_indexes_and_constraints(database):
+    _, connection = database
+    ids = create_things(connection, 25)
+
+    copied = online.rebuild_table(things_table(sa.Uuid()), things_table(CompactUUID()), batch_size=10)
+
+    assert copied == 25
+    assert schema_objects(connection) == {"things", "ix_things_name"}
+    assert connection.exec_driver_sql("SELECT DISTINCT typeof(id), length(id) FROM things").all() == [("blob", 16)]
+    table = things_table(CompactUUID())
+    assert connection.execute(sa.select(table.c.id, table.c.name).order_by(table.c.id)).all() == [
+        (value, f"thing {i}") for i, value in enumerate(ids)
+    ]
+    with pytest.raises(sa.exc.IntegrityError, match="UNIQUE"):
+        connection.execute(sa.insert(table).values(id=uuid.uuid4(), name="thing 0", size=1))
+    connection.rollback()
+    with pytest.raises(sa.exc.IntegrityError, match="CHECK"):
+        connection.execute(sa.insert(table).values(id=uuid.uuid4(), name="new", size=-1))
+    connection.rollback()
+
+
+def test_rebuild_table_keeps_writes_made_during_the_copy(database, monkeypatch):
+    path, connection = database
+    ids = create_things(connection, 30)
+    inserted = uuid.UUID(int=0)
+    writes = []
+
+    def write_between_batches(seconds):
+        # Another client writing to rows the copy has already passed
+        if not writes:
+            other = sqlite3.connect(path)
+            other.execute("INSERT INTO things VALUES (?, 'inserted', 1)", (inserted.hex,))
+            other.execute("UPDATE things SET name = 'updated' WHERE id = ?", (ids[0].hex,))
+            other.execute("DELETE FROM things WHERE id = ?", (ids[1].hex,))
+            other.commit()
+            other.close()
+            writes.append(seconds)
+
+    monkeypatch.setattr(online.time, "sleep", write_between_batches)
+    online.rebuild_table(things_table(sa.Uuid()), things_table(CompactUUID()), batch_size=10, pause_seconds=0.01)
+
+    table = things_table(CompactUUID())
+    rows = dict(connection.execute(sa.select(table.c.id, table.c.name)).all())
+    assert writes
+    assert len(rows) == 30
+    assert rows[inserted] == "inserted"
+    assert rows[ids[0]] == "updated"
+    assert ids[1] not in rows
+    assert online.report._pending_steps[-1].name == "swap things (writes blocked)"
+
+
+def test_rebuild_table_leaves_the_original_table_when_the_swap_fails(database):
+    _, connection = database
+    create_things(connection, 5)
+    connection.exec_driver_sql("UPDATE things SET size = 1")
+    connection.commit()
+    target = things_table(CompactUUID())
+    sa.Index("ix_things_size", target.c.size, unique=True)
+
+    with pytest.raises(sa.exc.IntegrityError):
+        online.rebuild_table(things_table(sa.Uuid()), target)
+
+    assert schema_objects(connection) == {"things", "ix_things_name"}
+    assert connection.exec_driver_sql("SELECT DISTINCT typeof(id), count(*) FROM things").all() == [("text", 5)]
+
+
+def index_columns(connection, name: str) -> list[str]:
+    return [row[2] for row in connection.exec_driver_sql(f"PRAGMA index_info({name})")]
+
+
+def test_create_and_drop_index_are_idempotent_on_sqlite(database):
+    _, connection = database
+    create_things(connection, 3)
+
+    online.create_index("ix_things_size", "things", ["size"])
+    online.create_index("ix_things_size", "things", ["size"])
+    assert index_columns(connection, "ix_things_size") == ["size"]
+
+    online.drop_index("ix_things_size", "things")
+    online.drop_index("ix_things_size", "things")
+    assert "ix_things_size" not in schema_objects(connection)
+    assert [step.name for step in online.report._pending_steps[-4:]] == [
+        "create index ix_things_size on things",
+        "create index ix_things_size on things",
+        "drop index ix_things_size on things",
+        "drop index ix_things_size on things",
+    ]
+
+
+def postgresql_statements(run, lock_timeout_ms=5000) -> list[str]:
+    """SQL the PostgreSQL branch of ``run`` emits, rendered offline."""
+    buffer = io.StringIO()
+    opts = {"as_sql": True, "output_buffer": buffer}
+    if lock_timeout_ms is not None:
+        opts["lock_timeout_ms"] = lock_timeout_ms
+    context = MigrationContext.configure(dialect_name="postgresql", opts=opts)
+    with Operations.context(context):
+        run()
+    return [statement.strip() for statement in buffer.getvalue().split(";") if statement.strip()]
+
+
+@pytest.mark.parametrize(
+    "valid, rebuild",
+    [(None, []), (False, ["DROP INDEX CONCURRENTLY ix_things_size"])],
+)
+def test_concurrent_index_statements_run_without_lock_timeout(monkeypatch, valid, rebuild):
+    monkeypatch.setattr(online, "_postgresql_index_is_valid", lambda name: valid)
+
+    statements = postgresql_statements(lambda: online.create_index("ix_things_size", "things", ["size"]))
+
+    assert statements == [
+        "COMMIT",
+        "SET lock_timeout = 0",
+        *rebuild,
+        "CREATE INDEX CONCURRENTLY ix_things_size ON things (size)",
+        "SET lock_timeout = 5000",
+        "BEGIN",
+    ]
+
+
+def test_concurrent_drop_restores_the_default_lock_timeout_when_none_was_set():
+    statements = postgresql_statements(lambda: online.drop_index("ix_things_size", "things"), lock_timeout_ms=None)
+
+    assert statements == [
+        "COMMIT",
+        "SET lock_timeout = 0",
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_things_size",
+        "RESET lock_timeout",
+        "BEGIN",
+    ]
+
+
+def test_valid_index_is_left_alone_without_touching_lock_timeout(monkeypatch):
+    monkeypatch.setattr(online, "_postgresql_index_is_valid", lambda name: True)
+
+    assert postgresql_statements(lambda: online.create_index("ix_things_size", "things", ["size"])) == ["COMMIT", "BEGIN"]
+
+
+def create_items(connection, count: int) -> None:
+    connection.exec_driver_sql("CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT)")
+    connection.execute(sa.text("INSERT INTO items (id) VALUES (:id)"), [{"id": i} for i in range(count)])
+    connection.commit()
+
+
+def count_updates(connection) -> list[str]:
+    statements = []
+    sa.event.listen(
+        connection,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement) if statement.startswith("UPDATE") else None,
+    )
+    return statements
+
+
+def test_backfill_updates_in_batches_until_nothing_matches(database):
+    _, connection = database
+    create_items(connection, 25)
+    updates = count_updates(connection)
+
+    updated = online.backfill("items", "label = 'item ' || id", "label IS NULL", batch_size=10)
+
+    assert updated == 25
+    # Three batches, then one that matches nothing and ends the loop
+    assert len(updates) == 4
+    assert connection.exec_driver_sql("SELECT count(*) FROM items WHERE label = 'item ' || id").scalar_one() == 25
+    assert online.report._pending_steps[-1].rows == 25
+
+
+def test_backfill_resumes_where_an_interrupted_run_stopped(database):
+    _, connection = database
+    create_items(connection, 25)
+    connection.exec_driver_sql("UPDATE items SET label = 'earlier run' WHERE id < 12")
+    connection.commit()
+
+    assert online.backfill("items", "label = :label", "label IS NULL", batch_size=10, params={"label": "resumed"}) == 13
+    assert connection.exec_driver_sql("SELECT label, count(*) FROM items GROUP BY label ORDER BY label").all() == [
+        ("earlier run", 12),
+        ("resumed", 13),
+    ]
+    connection.commit()
+    # Nothing left to do on a second run
+    assert online.backfill("items", "label = :label", "label IS NULL", params={"label": "again"}) == 0
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.services.monitoring.query_log import (
+    SlowQueryLog,
+    current_request_scope,
+    explain_prefix,
+    normalize_statement,
+    redact_parameters,
+)
+
+
+def test_normalize_statement_groups_literals_and_in_lists():
+    assert normalize_statement("SELECT * FROM t WHERE a = 'x' AND b IN ($1, $2, $3)") == (
+        "SELECT * FROM t WHERE a = ? AND b IN (?...)"
+    )
+    assert normalize_statement("SELECT  id::text FROM t\n WHERE id = :id_1") == "SELECT id::text FROM t WHERE id = ?"
+
+
+def test_normalize_statement_is_cached_per_statement():
+    statement = "SELECT * FROM cached WHERE id = :id_1"
+    normalize_statement(statement)
+    hits = normalize_statement.cache_info().hits
+
+    assert normalize_statement(statement) == "SELECT * FROM cached WHERE id = ?"
+    assert normalize_statement.cache_info().hits == hits + 1
+
+
+def test_explain_analyze_only_reruns_plain_reads():
+    assert explain_prefix("postgresql", "SELECT * FROM t WHERE id = %(id)s") == "EXPLAIN (ANALYZE, BUFFERS) "
+    assert explain_prefix("postgresql", "SELECT * FROM t WHERE id = %(id)s FOR UPDATE") == "EXPLAIN "
+    assert explain_prefix("postgresql", "select * from t for no key update skip locked") == "EXPLAIN "
+    assert explain_prefix("postgresql", "SELECT nextval('t_id_seq')") == "EXPLAIN "
+    assert explain_prefix("postgresql", "UPDATE t SET a = 1") == "EXPLAIN "
+    assert explain_prefix("sqlite", "SELECT * FROM t FOR UPDATE") == "EXPLAIN QUERY PLAN "
+    assert explain_prefix("postgresql", "VACUUM t") is None
+
+
+def test_redact_parameters_drops_text_values():
+    assert redact_parameters(("secret@example.com", 3, None, True)) == ["<str>", 3, None, True]
+    assert redact_parameters({"email": "secret@example.com"}) == {"email": "<str>"}
+
+
+@pytest.mark.asyncio
+async def test_slow_statements_are_aggregated_with_route_and_plan():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    query_log = SlowQueryLog(threshold_ms=0, explain=True)
+    query_log.install(engine)
+
+    token = current_request_scope.set({"type": "http", "method": "GET", "path": "/api/things"})
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE things (id INTEGER PRIMARY KEY, name TEXT)"))
+            for i in range(3):
+                await conn.execute(text("SELECT name FROM things WHERE id = :id"), {"id": i})
+    finally:
+        current_request_scope.reset(token)
+    await engine.dispose()
+
+    stats = next(s for s in query_log.snapshot() if s.statement.startswith("SELECT name"))
+    assert stats.calls == stats.slow_calls == 3
+    assert stats.last_route == "GET /api/things"
+    assert stats.last_parameters == [2]
+    assert stats.plan and "things" in stats.plan[0]
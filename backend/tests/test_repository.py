@@ -0,0 +1,140 @@
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import Column, DateTime
+from sqlalchemy.orm import DeclarativeBase
+
+from backend.column_types import CompactUUID
+from backend.repository import AsyncRepository, ConcurrentUpdateError, decode_cursor, encode_cursor
+from backend.services.example_service.models import ExampleModel
+from backend.services.example_service.routes import get_example_service
+from backend.services.example_service.routes import router as example_router
+from backend.services.example_service.service import ExampleService
+
+
+class EventBase(DeclarativeBase):
+    pass
+
+
+class Event(EventBase):
+    __tablename__ = "event"
+    id = Column(CompactUUID, primary_key=True, default=uuid.uuid4)
+    happened_at = Column(DateTime, nullable=False)
+
+
+class EventRepository(AsyncRepository[Event]):
+    model = Event
+
+
+@pytest_asyncio.fixture
+async def service(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(ExampleModel.__table__)
+    async with session_maker() as session:
+        yield ExampleService(session)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_updates_existing_rows(service):
+    await service.bulk_insert([{"name": f"n{i}", "description": "old"} for i in range(10)])
+    await service.import_examples([{"name": "n1", "description": "new"}, {"name": "n10", "description": "new"}])
+
+    assert await service.count() == 11
+    assert await service.count(ExampleModel.description == "new") == 2
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_walks_all_rows(service):
+    await service.bulk_insert([{"name": f"n{i:02d}"} for i in range(25)])
+
+    names, cursor = [], None
+    while True:
+        page = await service.paginate(limit=10, cursor=cursor, order_by="name", columns=["name"])
+        names.extend(example.name for example in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert names == [f"n{i:02d}" for i in range(25)]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pagination_over_uuid_and_datetime_keys(sqlite_session_maker):
+    session_maker = await sqlite_session_maker(Event.__table__)
+    start = datetime(2026, 1, 1)
+    # Repeated timestamps so the id tie-breaker decides within each one
+    rows = [{"id": uuid.uuid4(), "happened_at": start + timedelta(seconds=i // 3)} for i in range(20)]
+
+    async with session_maker() as session:
+        repository = EventRepository(session)
+        await repository.bulk_insert(rows)
+        seen, cursor = [], None
+        while True:
+            page = await repository.paginate(limit=4, cursor=cursor, order_by="happened_at")
+            seen.extend(event.id for event in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert seen == [row["id"] for row in sorted(rows, key=lambda row: (row["happened_at"], str(row["id"])))]
+
+
+def test_cursor_values_keep_their_types():
+    values = [datetime(2026, 1, 1, 12, 30, 15, 250), uuid.uuid4(), 7]
+
+    assert decode_cursor(encode_cursor(values), [datetime, uuid.UUID, int]) == values
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(encode_cursor(values[:2]), [datetime, uuid.UUID, int])
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(encode_cursor(["not a date"]), [datetime])
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursor_is_a_bad_request(service):
+    await service.bulk_insert([{"name": f"n{i}"} for i in range(3)])
+    app = FastAPI()
+    app.include_router(example_router)
+    app.dependency_overrides[get_example_service] = lambda: service
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for cursor in (encode_cursor([1, 2]), encode_cursor([]), encode_cursor(["1"]), "!!"):
+            response = await client.get("/example", params={"cursor": cursor})
+            assert response.status_code == 400, cursor
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_every_row(service):
+    await service.bulk_insert([{"name": f"n{i}"} for i in range(30)])
+
+    assert len([example async for example in service.stream(batch_size=7)]) == 30
+
+
+@pytest.mark.asyncio
+async def test_update_versioned_rejects_stale_version(service):
+    example = await service.create_example({"name": "a"})
+
+    updated = await service.update_versioned(example.id, expected_version=1, values={"description": "first"})
+    assert updated.version == 2
+    assert updated.description == "first"
+
+    with pytest.raises(ConcurrentUpdateError):
+        await service.update_versioned(example.id, expected_version=1, values={"description": "second"})
+    assert await service.update_versioned(999, expected_version=1, values={}) is None
+
+
+@pytest.mark.asyncio
+async def test_update_conflict_keeps_the_callers_other_changes(service):
+    example = await service.create_example({"name": "a"})
+    await service.update_versioned(example.id, expected_version=1, values={"description": "first"})
+
+    service.session.add(ExampleModel(name="added by the caller"))
+    await service.session.flush()
+    with pytest.raises(ConcurrentUpdateError):
+        await service.update_versioned(example.id, expected_version=1, values={"description": "second"})
+    await service.session.commit()
+
+    assert await service.count(ExampleModel.name == "added by the caller") == 1
+    assert (await service.get(example.id)).description == "first"
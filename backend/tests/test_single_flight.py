@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from backend.single_flight import SingleFlight, single_flight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test")
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(group.do("key", load) for _ in range(10)))
+
+    assert results == [1] * 10
+    assert len(group) == 0
+    # Results are not cached once the flight has landed
+    assert await group.do("key", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_every_caller():
+    group = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise LookupError("boom")
+
+    results = await asyncio.gather(*(group.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, LookupError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_timeout_applies_per_key():
+    group = SingleFlight("test", timeout=0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await group.do("slow", lambda: asyncio.sleep(1))
+    assert await group.do("fast", lambda: asyncio.sleep(0, result="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_decorator_coalesces_by_key():
+    group = SingleFlight("test")
+    calls = []
+
+    @single_flight(group, key=lambda item_id: item_id)
+    async def get_item(item_id: int):
+        calls.append(item_id)
+        await asyncio.sleep(0.01)
+        return {"id": item_id}
+
+    await asyncio.gather(get_item(1), get_item(1), get_item(2))
+
+    assert sorted(calls) == [1, 2]
@@ -0,0 +1,117 @@
+import json
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.services.monitoring.middleware import TracingMiddleware
+from backend.services.monitoring.tracing import OTLPJsonExporter, SpanContext, Tracer, TracingTransport
+
+
+def exported_spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return {span["name"]: span for span in spans}
+
+
+def test_traceparent_round_trip():
+    context = SpanContext.from_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+
+    assert context == SpanContext("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7", sampled=True)
+    assert context.traceparent() == "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert SpanContext.from_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+    assert SpanContext.from_traceparent("garbage") is None
+
+
+@pytest.mark.asyncio
+async def test_request_spans_nest_database_and_http_client_spans(tmp_path):
+    export_path = tmp_path / "spans.jsonl"
+    tracer = Tracer(OTLPJsonExporter(str(export_path), "test"), sample_ratio=1.0, enabled=True)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tracer.install(engine)
+
+    outgoing = []
+
+    def upstream(request):
+        outgoing.append(request.headers.get("traceparent"))
+        return httpx.Response(200)
+
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT :id AS id"), {"id": thing_id})
+        transport = TracingTransport(httpx.MockTransport(upstream), tracer=tracer)
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("http://upstream.test/lookup")
+        return {"id": thing_id}
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=TracingMiddleware(app, tracer)), base_url="http://test")
+    async with client:
+        response = await client.get("/things/7")
+    tracer.shutdown()
+    await engine.dispose()
+
+    assert response.status_code == 200
+    spans = exported_spans(export_path)
+    request_span = spans["GET /things/{thing_id}"]
+    statement_span = spans["SELECT"]
+    http_span = spans["GET upstream.test"]
+
+    assert "parentSpanId" not in request_span
+    assert statement_span["parentSpanId"] == http_span["parentSpanId"] == request_span["spanId"]
+    assert {statement_span["traceId"], http_span["traceId"]} == {request_span["traceId"]}
+    assert {"key": "db.statement", "value": {"stringValue": "SELECT ? AS id"}} in statement_span["attributes"]
+    assert outgoing == [f"00-{request_span['traceId']}-{http_span['spanId']}-01"]
+
+
+@pytest.mark.asyncio
+async def test_sampling_is_decided_at_the_root_and_honors_incoming_traceparent(tmp_path):
+    export_path = tmp_path / "spans.jsonl"
+    tracer = Tracer(OTLPJsonExporter(str(export_path), "test"), sample_ratio=0.0, enabled=True)
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        with tracer.start_span("work"):
+            return {}
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=TracingMiddleware(app, tracer)), base_url="http://test")
+    async with client:
+        await client.get("/ping")
+        tracer.shutdown()
+        assert not export_path.exists()
+
+        traceparent = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        await client.get("/ping", headers={"traceparent": traceparent})
+    tracer.shutdown()
+
+    spans = exported_spans(export_path)
+    assert spans["GET /ping"]["traceId"] == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert spans["GET /ping"]["parentSpanId"] == "00f067aa0ba902b7"
+    assert spans["work"]["parentSpanId"] == spans["GET /ping"]["spanId"]
+
+
+def test_exporter_writes_from_its_own_thread(tmp_path, monkeypatch):
+    exporter = OTLPJsonExporter(str(tmp_path / "spans.jsonl"), "test", max_batch=2)
+    tracer = Tracer(exporter, sample_ratio=1.0, enabled=True)
+    writers = []
+    write = exporter._write
+    monkeypatch.setattr(exporter, "_write", lambda spans: writers.append(threading.current_thread().name) or write(spans))
+
+    for name in ("a", "b", "c"):
+        with tracer.start_span(name):
+            pass
+    tracer.shutdown()
+
+    assert set(exported_spans(tmp_path / "spans.jsonl")) == {"a", "b", "c"}
+    # One full batch, then the rest on flush
+    assert writers == ["otlp-json-exporter", "otlp-json-exporter"]
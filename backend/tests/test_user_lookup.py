@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db import get_async_session
+from backend.services.auth.dependencies import get_jwt_strategy
+from backend.services.users import service
+from backend.services.users.models import User
+from backend.services.users.routes import router as users_router
+from backend.services.users.service import CoalescingUserDatabase
+
+
+@pytest_asyncio.fixture
+async def sessions(sqlite_engine, monkeypatch):
+    engine = await sqlite_engine(User.__table__)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    monkeypatch.setattr(service, "async_session_maker", session_maker)
+    return engine, session_maker
+
+
+async def add_user(session_maker) -> User:
+    async with session_maker() as session:
+        user = User(id=uuid.uuid4(), email="me@example.com", hashed_password="x", is_active=True)
+        session.add(user)
+        await session.commit()
+        return user
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_the_current_user_share_one_select(sessions):
+    engine, session_maker = sessions
+    user = await add_user(session_maker)
+    token = await get_jwt_strategy().write_token(user)
+
+    async def get_session():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(users_router, prefix="/api")
+    app.dependency_overrides[get_async_session] = get_session
+
+    user_selects = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(conn, cursor, statement, *args):
+        if statement.startswith("SELECT") and "FROM user" in statement:
+            user_selects.append(statement)
+
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.get("/api/users/me", headers=headers) for _ in range(50)))
+
+    assert {response.status_code for response in responses} == {200}
+    assert {response.json()["id"] for response in responses} == {str(user.id)}
+    assert len(user_selects) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_returns_the_instance_the_session_already_holds(sessions):
+    _, session_maker = sessions
+    user = await add_user(session_maker)
+
+    async with session_maker() as session:
+        loaded = await session.get(User, user.id)
+        loaded.is_verified = True
+
+        user_db = CoalescingUserDatabase(session, User)
+        assert await user_db.get(user.id) is loaded
+        assert loaded.is_verified
+        assert loaded in session.dirty